@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Post, Comment
+from django.utils import timezone
+from .models import Post, Comment, OutgoingEmail
 
 
 @admin.register(Post)
@@ -11,6 +12,7 @@ class PostAdmin(admin.ModelAdmin):
     raw_id_fields = ['author']
     date_hierarchy = 'publish'
     ordering = ['status', 'publish']
+    list_select_related = ['author']
     show_facets = admin.ShowFacets.ALWAYS
 
 
@@ -19,3 +21,32 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'post', 'created', 'activate']
     list_filter = ['activate', 'created', 'updated']
     search_fields = ['name', 'email', 'body']
+    list_select_related = ['post']
+    actions = ['activate_comments', 'deactivate_comments']
+
+    @admin.action(description='Activate selected comments')
+    def activate_comments(self, request, queryset):
+        queryset.set_active(True)
+
+    @admin.action(description='Deactivate selected comments')
+    def deactivate_comments(self, request, queryset):
+        queryset.set_active(False)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'next_attempt', 'sent']
+    list_filter = ['status', 'created']
+    search_fields = ['subject', 'to']
+    readonly_fields = ['attempts', 'last_error', 'created', 'sent']
+    actions = ['retry_emails']
+
+    @admin.action(description='Retry selected emails')
+    def retry_emails(self, request, queryset):
+        queryset.exclude(
+            status__in=[OutgoingEmail.Status.SENDING, OutgoingEmail.Status.SENT],
+        ).update(
+            status=OutgoingEmail.Status.PENDING,
+            attempts=0,
+            next_attempt=timezone.now(),
+        )
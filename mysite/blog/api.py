@@ -0,0 +1,197 @@
+"""
+Read-only JSON API of the published posts and their tags.
+
+Posts are serialized straight from model instances, without templates.
+``fields=title,url,...`` selects the fields of the posts: only the
+columns they need are loaded, so that list payloads carry no bodies
+unless asked for. Lists are paginated with the ``cursor`` of the
+previous page, search results with ``page`` numbers.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import HttpRequest, JsonResponse
+from django.urls import reverse
+from taggit.models import Tag, TaggedItem
+
+from .forms import SearchForm
+from .models import Post
+from .pagination import CursorPaginator, InvalidCursor
+
+
+class InvalidFields(Exception):
+    pass
+
+
+# Field of the payload: columns loaded, relation joined or prefetched,
+# and the value serialized
+POST_FIELDS = {
+    'id': ((), None, lambda post: post.id),
+    'title': (('title',), None, lambda post: post.title),
+    'slug': (('slug',), None, lambda post: post.slug),
+    'url': (('slug',), None, lambda post: post.get_absolute_url()),
+    'author': (
+        ('author__username',), 'author', lambda post: post.author.username,
+    ),
+    'publish': ((), None, lambda post: post.publish),
+    'updated': (('updated',), None, lambda post: post.updated),
+    'excerpt': (('excerpt',), None, lambda post: post.excerpt),
+    'body': (('body',), None, lambda post: post.body),
+    'body_html': (('body_html',), None, lambda post: post.body_html),
+    'comment_count': (
+        ('comment_count',), None, lambda post: post.comment_count,
+    ),
+    'tags': ((), 'tags', lambda post: [tag.name for tag in post.tags.all()]),
+}
+LIST_FIELDS = (
+    'id', 'title', 'url', 'author', 'publish', 'excerpt', 'tags',
+    'comment_count',
+)
+DETAIL_FIELDS = (*LIST_FIELDS, 'updated', 'body_html')
+
+
+def _fields(request: HttpRequest, default: tuple[str, ...]) -> list[str]:
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(default)
+    fields = list(dict.fromkeys(
+        name.strip() for name in requested.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in POST_FIELDS]
+    if unknown or not fields:
+        raise InvalidFields(', '.join(unknown))
+    return fields
+
+
+def _load_only(queryset, fields: list[str]):
+    """
+        Restrict the queryset to the columns of ``fields``. The id and
+        date are always loaded, the page cursor is made from them.
+    """
+    columns = ['id', 'publish']
+    for name in fields:
+        loaded, relation, _ = POST_FIELDS[name]
+        columns.extend(loaded)
+        if relation == 'author':
+            queryset = queryset.select_related('author')
+        elif relation == 'tags':
+            queryset = queryset.prefetch_related('tags')
+    return queryset.only(*columns)
+
+
+def _serialize(post: Post, fields: list[str]) -> dict:
+    return {name: POST_FIELDS[name][2](post) for name in fields}
+
+
+def _error(message: str, status: int = 400) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+def _post_page(request: HttpRequest, queryset) -> JsonResponse:
+    try:
+        fields = _fields(request, LIST_FIELDS)
+    except InvalidFields as e:
+        return _error(f'Unknown fields: {e}')
+    paginator = CursorPaginator(
+        _load_only(queryset, fields), settings.BLOG_API_PAGE_SIZE,
+    )
+    try:
+        posts = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return _error('Invalid cursor')
+    return JsonResponse({
+        'posts': [_serialize(post, fields) for post in posts],
+        'next_cursor': posts.next_cursor,
+        'previous_cursor': posts.previous_cursor,
+    })
+
+
+def post_list(request: HttpRequest) -> JsonResponse:
+    """
+        Published posts, newest first, optionally of the ``tag`` slug
+    """
+    posts = Post.published.all()
+    tag_slug = request.GET.get('tag')
+    if tag_slug:
+        tag = Tag.objects.filter(slug=tag_slug).first()
+        if tag is None:
+            return _error('Tag not found', status=404)
+        posts = posts.tagged(tag)
+    return _post_page(request, posts)
+
+
+def post_detail(request: HttpRequest, post_id: int) -> JsonResponse:
+    try:
+        fields = _fields(request, DETAIL_FIELDS)
+    except InvalidFields as e:
+        return _error(f'Unknown fields: {e}')
+    post = _load_only(Post.published.all(), fields).filter(id=post_id).first()
+    if post is None:
+        return _error('Post not found', status=404)
+    return JsonResponse(_serialize(post, fields))
+
+
+def tag_list(request: HttpRequest) -> JsonResponse:
+    """
+        Tags of any published post, by name
+    """
+    tags = Tag.objects.filter(id__in=TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Post),
+        object_id__in=Post.published.values('id'),
+    ).values('tag_id'))
+    paginator = CursorPaginator(
+        tags, settings.BLOG_API_PAGE_SIZE, ordering=('name', 'id'),
+    )
+    try:
+        tags = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return _error('Invalid cursor')
+    return JsonResponse({
+        'tags': [
+            {
+                'name': tag.name,
+                'slug': tag.slug,
+                'posts_url': f"{reverse('blog:api_post_list')}?tag={tag.slug}",
+            }
+            for tag in tags
+        ],
+        'next_cursor': tags.next_cursor,
+        'previous_cursor': tags.previous_cursor,
+    })
+
+
+def post_search(request: HttpRequest) -> JsonResponse:
+    """
+        Page ``page`` of the posts matching ``query``, best first. Ranks
+        are not a column a cursor could seek, but results are capped to
+        BLOG_SEARCH_MAX_RESULTS so that no offset is large.
+    """
+    form = SearchForm(request.GET)
+    if not form.is_valid():
+        return _error('Invalid query')
+    try:
+        fields = _fields(request, LIST_FIELDS)
+    except InvalidFields as e:
+        return _error(f'Unknown fields: {e}')
+    try:
+        number = int(request.GET.get('page', 1))
+        if number < 1:
+            raise ValueError(number)
+    except ValueError:
+        return _error('Invalid page')
+
+    start = (number - 1) * settings.BLOG_API_PAGE_SIZE
+    end = min(
+        start + settings.BLOG_API_PAGE_SIZE, settings.BLOG_SEARCH_MAX_RESULTS,
+    )
+    results = []
+    if start < end:
+        # One more result tells whether there is a next page
+        results = list(
+            _load_only(Post.published.all(), fields)
+            .search(form.cleaned_data['query'], headline=False)[start:end + 1]
+        )
+    has_next = len(results) > end - start and end < settings.BLOG_SEARCH_MAX_RESULTS
+    return JsonResponse({
+        'posts': [_serialize(post, fields) for post in results[:end - start]],
+        'next_page': number + 1 if has_next else None,
+    })
@@ -0,0 +1,162 @@
+"""
+Async versions of the read-only blog pages, routed instead of the views of
+blog.views when BLOG_ASYNC_VIEWS is set and the site is served over ASGI.
+
+A reader waiting on the network then holds no worker thread: the queries
+run through the async ORM interface and only the template rendering, whose
+tags still query the database synchronously, is handed to a thread.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import aget_object_or_404, render
+from taggit.models import Tag
+
+from .conditional import Validator, conditional
+from .feeds import LatestPostsFeed, TagPostsFeed, _feed_validator, _feed_versions
+from .forms import SearchForm
+from .models import Post
+from .pagecache import (
+    POSTS,
+    cache_anonymous_page,
+    depends_on,
+    post_dependency,
+    tag_dependency,
+)
+from .pagination import CursorPaginator, InvalidCursor
+from .views import (
+    POSTS_PER_PAGE,
+    _comment_paginator,
+    _detail_context,
+    _list_validator,
+    _listing_versions,
+    _post_validator,
+    _published_lookup,
+    _post_versions,
+    _search_context,
+    _search_page,
+    _search_results,
+    _similar_posts,
+)
+
+arender = sync_to_async(render)
+
+
+async def _cursor_page(posts_list, request: HttpRequest):
+    paginator = CursorPaginator(posts_list, POSTS_PER_PAGE)
+    try:
+        return await paginator.apage(request.GET.get('cursor'))
+    except InvalidCursor:
+        # If the cursor is malformed get the first page
+        return await paginator.apage()
+
+
+async def _published_post(queryset, year: int, month: int, day: int, slug: str):
+    lookup = _published_lookup(queryset, year, month, day, slug)
+    return None if lookup is None else await lookup.afirst()
+
+
+async def post_list_validator(request: HttpRequest,
+                              tag_slug: str = None) -> Validator:
+    return _list_validator(
+        await _cursor_page(_listing_versions(tag_slug), request)
+    )
+
+
+@cache_anonymous_page
+@conditional(post_list_validator)
+async def post_list(request: HttpRequest, tag_slug: str = None) -> HttpResponse:
+    posts_list = Post.published.for_listing()
+    tag = None
+    if tag_slug:
+        tag = await aget_object_or_404(Tag, slug=tag_slug)
+        posts_list = posts_list.tagged(tag)
+        depends_on(tag_dependency(tag.slug))
+
+    posts = await _cursor_page(posts_list, request)
+    depends_on(POSTS, *(post_dependency(post.id) for post in posts))
+    return await arender(
+        request,
+        'blog/post/list.html',
+        {
+            'posts': posts,
+            'tag': tag,
+        }
+    )
+
+
+async def post_detail_validator(request: HttpRequest, year: int, month: int,
+                                day: int, post: str) -> Validator | None:
+    return _post_validator(await _published_post(
+        _post_versions(), year, month, day, post,
+    ))
+
+
+@cache_anonymous_page
+@conditional(post_detail_validator)
+async def post_detail(request: HttpRequest, year: int, month: int, day: int,
+                      post: str) -> HttpResponse:
+    post = await _published_post(
+        Post.published.select_related('author'), year, month, day, post,
+    )
+    if post is None:
+        raise Http404('No post at this date')
+
+    async def active_comments():
+        return await _comment_paginator(post.id).apage()
+
+    async def similar_posts() -> list[Post]:
+        return [entry.similar async for entry in _similar_posts(post)]
+
+    # Both only need the post
+    comments, similar = await asyncio.gather(active_comments(), similar_posts())
+    return await arender(
+        request,
+        'blog/post/detail.html',
+        _detail_context(post, comments, similar),
+    )
+
+
+async def post_search(request: HttpRequest) -> HttpResponse:
+    form = SearchForm()
+    query = None
+    results = []
+
+    if 'query' in request.GET:
+        form = SearchForm(request.GET)
+        if form.is_valid():
+            query = form.cleaned_data['query']
+            paginator = _search_results(query)
+            # Counted here, so that the paginator does not query
+            paginator.count = await paginator.object_list.acount()
+            results = _search_page(paginator, request.GET.get('page', 1))
+            results.object_list = [post async for post in results.object_list]
+
+    return await arender(
+        request,
+        'blog/post/search.html',
+        _search_context(form, query, results),
+    )
+
+
+async def feed_validator(request: HttpRequest, tag_slug: str = None) -> Validator:
+    return _feed_validator([item async for item in _feed_versions(tag_slug)])
+
+
+def async_feed(feed: LatestPostsFeed):
+    """
+        Feed view validated asynchronously. A response missing from the
+        cache is rendered by the synchronous feed framework in a thread.
+    """
+    cached_response = sync_to_async(feed.cached_response)
+
+    @conditional(feed_validator)
+    async def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        return await cached_response(request, *args, **kwargs)
+
+    return view
+
+
+post_feed = async_feed(LatestPostsFeed())
+post_feed_by_tag = async_feed(TagPostsFeed())
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+# Name of the {% cache %} fragment wrapping the sidebar in base.html
+SIDEBAR_FRAGMENT = 'blog_sidebar'
+# Sections of the sitemap index and their last modification
+SITEMAP_INDEX = 'blog_sitemap_index'
+SITEMAP_PROTOCOLS = ('http', 'https')
+# Version of every cached feed, changed to drop them all at once
+FEEDS_VERSION = 'blog_feeds_version'
+
+
+def invalidate_sidebar() -> None:
+    cache.delete(make_template_fragment_key(SIDEBAR_FRAGMENT))
+
+
+def sitemap_section_key(section: int, protocol: str) -> str:
+    return f'blog_sitemap_section_{section}_{protocol}'
+
+
+def invalidate_sitemap(post_ids) -> None:
+    """
+        Drop the index and the sitemap sections holding the given posts
+    """
+    sections = {post_id // settings.BLOG_SITEMAP_SECTION_SIZE for post_id in post_ids}
+    cache.delete_many([
+        SITEMAP_INDEX,
+        *(
+            sitemap_section_key(section, protocol)
+            for section in sections
+            for protocol in SITEMAP_PROTOCOLS
+        ),
+    ])
+
+
+def feeds_version() -> int:
+    version = cache.get(FEEDS_VERSION)
+    if version is None:
+        # A fresh version, entries of an evicted one must not be reused
+        cache.add(FEEDS_VERSION, time.time_ns(), None)
+        version = cache.get(FEEDS_VERSION)
+    return version
+
+
+def feed_key(path: str, protocol: str) -> str:
+    return f'blog_feed_{protocol}_{path}'
+
+
+def invalidate_feeds() -> None:
+    cache.set(FEEDS_VERSION, time.time_ns(), None)
+
@@ -0,0 +1,65 @@
+"""
+Conditional GET for the blog pages.
+
+A validator computes the ETag and Last-Modified of a page from a single
+cheap query, so that clients revalidating an unchanged page are answered
+with 304 Not Modified without running the view.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from typing import NamedTuple
+
+from asgiref.sync import iscoroutinefunction
+from django.views.decorators.http import condition
+
+
+class Validator(NamedTuple):
+    etag: str | None
+    last_modified: datetime | None
+
+
+def make_validator(parts, last_modified: datetime | None) -> Validator:
+    """
+        Weak ETag hashing ``parts``, everything the page depends on
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return Validator(f'W/"{digest}"', last_modified)
+
+
+def conditional(validator):
+    """
+        Like ``condition()``, with ``validator(request, *args, **kwargs)``
+        returning both the ETag and Last-Modified (or None when the page
+        does not exist). It is called once per request, and may be a
+        coroutine function to validate async views.
+    """
+
+    def validate(request, *args, **kwargs) -> Validator:
+        if not hasattr(request, '_blog_validator'):
+            request._blog_validator = (
+                validator(request, *args, **kwargs) or Validator(None, None)
+            )
+        return request._blog_validator
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda *args, **kwargs: validate(*args, **kwargs).etag,
+            last_modified_func=(
+                lambda *args, **kwargs: validate(*args, **kwargs).last_modified
+            ),
+        )(view)
+        if not iscoroutinefunction(validator):
+            return conditional_view
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            # Validated beforehand, condition() calls the functions synchronously
+            request._blog_validator = (
+                await validator(request, *args, **kwargs) or Validator(None, None)
+            )
+            return await conditional_view(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,123 @@
+"""
+Draft posts written by the OpenAI chat completions API.
+
+Drafts are requested concurrently with the async client: the body and the
+tags of a draft are requested together once its title is known, and several
+drafts are in flight at once. Finished drafts are inserted in bulk.
+"""
+import asyncio
+from dataclasses import dataclass, field
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.text import slugify
+from django.utils.timezone import now
+from openai import AsyncOpenAI
+from taggit.models import Tag, TaggedItem
+
+from .models import Post, SimilarPost
+
+MODEL = 'gpt-3.5-turbo'
+TITLE_PROMPT = "Generate a creative and catchy title for a tech blog post."
+BODY_PROMPT = "Write a detailed blog post about '{title}'."
+TAGS_PROMPT = "Suggest relevant tags for a blog post about '{title}'."
+
+
+@dataclass
+class Draft:
+    title: str
+    body: str
+    tags: list[str] = field(default_factory=list)
+
+
+def _parse_tags(text: str) -> list[str]:
+    tags = []
+    for tag in text.split(','):
+        tag = tag.strip().lstrip('#').strip()[:100]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+async def _complete(client: AsyncOpenAI, prompt: str, max_tokens: int) -> str:
+    response = await client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        model=MODEL,
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def write_draft(client: AsyncOpenAI) -> Draft:
+    title = await _complete(client, TITLE_PROMPT, 10)
+    body, tags = await asyncio.gather(
+        _complete(client, BODY_PROMPT.format(title=title), 100),
+        _complete(client, TAGS_PROMPT.format(title=title), 10),
+    )
+    return Draft(title=title[:250], body=body, tags=_parse_tags(tags))
+
+
+async def write_drafts(client: AsyncOpenAI, count: int,
+                       concurrency: int) -> list[Draft | Exception]:
+    """
+        Write ``count`` drafts with at most ``concurrency`` in flight. A
+        draft whose requests still fail after the client's retries is
+        returned as the exception instead.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded() -> Draft:
+        async with semaphore:
+            return await write_draft(client)
+
+    return await asyncio.gather(
+        *(bounded() for _ in range(count)), return_exceptions=True,
+    )
+
+
+def _get_tags(names: set[str]) -> dict[str, Tag]:
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = names - tags.keys()
+    Tag.objects.bulk_create(
+        [Tag(name=name, slug=slugify(name)) for name in missing],
+        ignore_conflicts=True,
+    )
+    tags.update(
+        (tag.name, tag) for tag in Tag.objects.filter(name__in=missing)
+    )
+    # Names whose slug is taken, Tag.save() picks a free one
+    for name in missing - tags.keys():
+        tags[name] = Tag.objects.create(name=name)
+    return tags
+
+
+def save_drafts(drafts: list[Draft], author) -> list[Post]:
+    """
+        Insert the drafts and their tags with a few bulk queries
+    """
+    publish = now()
+    posts = []
+    for draft in drafts:
+        post = Post(
+            title=draft.title,
+            slug=slugify(draft.title)[:250],
+            author=author,
+            body=draft.body,
+            publish=publish,
+            status=Post.Status.DRAFT,
+        )
+        post.render_body()
+        posts.append(post)
+
+    with transaction.atomic():
+        Post.objects.bulk_create(posts)
+        tags = _get_tags({name for draft in drafts for name in draft.tags})
+        content_type = ContentType.objects.get_for_model(Post)
+        TaggedItem.objects.bulk_create([
+            TaggedItem(content_type=content_type, object_id=post.id, tag=tags[name])
+            for post, draft in zip(posts, drafts)
+            for name in draft.tags
+        ])
+        # Drafts are not candidates of other posts, only their own lists change
+        SimilarPost.objects.rebuild(post.id for post in posts)
+    return posts
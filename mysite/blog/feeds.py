@@ -1,23 +1,97 @@
-import markdown
+from django.conf import settings
 from django.contrib.syndication.views import Feed
-from django.template.defaultfilters import truncatechars_html
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from mysite.routers import primary_reads
+from taggit.models import Tag
 
+from .cache import feed_key, feeds_version
+from .conditional import Validator, conditional, make_validator
 from .models import Post
 
+FEED_ITEMS = 5
+
+
+def _feed_versions(tag_slug: str = None):
+    posts = Post.published.all()
+    if tag_slug:
+        posts = posts.tagged(tag_slug)
+    return posts.values_list('id', 'updated')[:FEED_ITEMS]
+
+
+def _feed_validator(items: list[tuple]) -> Validator:
+    # No Last-Modified, like the lists: removed posts make it no older
+    return make_validator(items, None)
+
+
+def latest_posts_validator(request, tag_slug: str = None) -> Validator:
+    """
+        Versions of the posts in the feed
+    """
+    return _feed_validator(list(_feed_versions(tag_slug)))
+
+
 class LatestPostsFeed(Feed):
+    """
+        Feed rendered once per version of the published posts, see
+        invalidate_feeds()
+    """
     title = "My Blog"
     link = reverse_lazy('blog:post_list')
     description = "New posts of my blog."
 
+    def __call__(self, request, *args, **kwargs):
+        view = conditional(latest_posts_validator)(self.cached_response)
+        return view(request, *args, **kwargs)
+
+    def cached_response(self, request, *args, **kwargs):
+        key = feed_key(request.path, request.scheme)
+        version = feeds_version()
+        response = cache.get(key, version=version)
+        if response is None:
+            with primary_reads():
+                response = super().__call__(request, *args, **kwargs)
+            # Revalidated by ETag only, see _feed_validator()
+            response.headers.pop('Last-Modified', None)
+            # Expiring, as entries of superseded versions are never read again
+            cache.set(
+                key, response, settings.BLOG_PAGE_CACHE_TIMEOUT, version=version,
+            )
+        return response
+
     def items(self) -> list[Post]:
-        return Post.published.all()[:5]
+        return Post.published.without_bodies()[:FEED_ITEMS]
     
     def item_title(self, item: Post) -> str:
         return item.title
 
     def item_description(self, item) -> str:
-        return truncatechars_html(markdown.markdown(item.body), 30)
+        # Rendered and truncated once, when the post is saved
+        return item.excerpt
     
     def item_pubdate(self, item: Post) -> str:
-        return item.publish
\ No newline at end of file
+        return item.publish
+
+    def item_updateddate(self, item: Post) -> str:
+        # Touched by comments too, like the ETag of latest_posts_validator()
+        return item.updated
+
+
+class TagPostsFeed(LatestPostsFeed):
+    def get_object(self, request, tag_slug: str) -> Tag:
+        return get_object_or_404(Tag, slug=tag_slug)
+
+    def title(self, tag: Tag) -> str:
+        return f"My Blog: posts tagged with {tag.name}"
+
+    def link(self, tag: Tag) -> str:
+        return reverse('blog:post_list_by_tag', args=[tag.slug])
+
+    def description(self, tag: Tag) -> str:
+        return f"New posts of my blog tagged with {tag.name}."
+
+    def items(self, tag: Tag) -> list[Post]:
+        return (
+            Post.published.without_bodies().tagged(tag)[:FEED_ITEMS]
+        )
@@ -0,0 +1,191 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from taggit.models import Tag
+
+from blog import urls as blog_urls
+from blog.models import Comment, Post
+from blog.seeding import seed_dataset
+
+
+def _route_requests() -> dict:
+    """
+        One sample request per blog route, plus the sitemaps and the feed
+    """
+    post = Post.published.order_by('-comment_count').first()
+    tag = Tag.objects.order_by('id').first()
+    if post is None or tag is None:
+        raise CommandError("The dataset needs a published post and a tag.")
+    word = post.title.split()[0]
+    comment = {
+        'name': 'Benchmark',
+        'email': 'benchmark@example.com',
+        'body': 'Benchmark comment',
+    }
+    return {
+        'blog:post_list': ('get', reverse('blog:post_list'), None),
+        'blog:post_list_by_tag': (
+            'get', reverse('blog:post_list_by_tag', args=[tag.slug]), None,
+        ),
+        'blog:post_detail': ('get', post.get_absolute_url(), None),
+        'blog:post_share': (
+            'get', reverse('blog:post_share', args=[post.id]), None,
+        ),
+        'blog:post_comments': (
+            'get', reverse('blog:post_comments', args=[post.id]), None,
+        ),
+        'blog:post_comment': (
+            'post', reverse('blog:post_comment', args=[post.id]), comment,
+        ),
+        'blog:post_feed': ('get', reverse('blog:post_feed'), None),
+        'blog:post_feed_by_tag': (
+            'get', reverse('blog:post_feed_by_tag', args=[tag.slug]), None,
+        ),
+        'blog:post_search': ('get', reverse('blog:post_search'), {'query': word}),
+        'blog:api_post_list': ('get', reverse('blog:api_post_list'), None),
+        'blog:api_post_detail': (
+            'get', reverse('blog:api_post_detail', args=[post.id]), None,
+        ),
+        'blog:api_tag_list': ('get', reverse('blog:api_tag_list'), None),
+        'blog:api_post_search': (
+            'get', reverse('blog:api_post_search'), {'query': word},
+        ),
+        'sitemap': ('get', reverse('sitemap'), None),
+        'sitemap_section': (
+            'get',
+            reverse(
+                'sitemap_section',
+                args=[post.id // settings.BLOG_SITEMAP_SECTION_SIZE],
+            ),
+            None,
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the latency of every blog URL and report it as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--no-isolate',
+            action='store_true',
+            help="Run against the configured database instead of a "
+                 "throwaway test database.",
+        )
+        parser.add_argument(
+            '--no-seed',
+            action='store_true',
+            help="Benchmark the existing data without seeding.",
+        )
+        parser.add_argument(
+            '--output',
+            help="Write the JSON report to this file instead of stdout.",
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError("At least two iterations are needed.")
+
+        isolate = not options['no_isolate']
+        if isolate:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False,
+            )
+        try:
+            if not options['no_seed']:
+                seed_dataset(
+                    options['posts'], options['tags'], options['comments'],
+                )
+            overrides = {
+                'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+                'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+                # A cache of its own, leaving the configured one alone
+                'CACHES': {
+                    'default': {
+                        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                        'LOCATION': 'benchmark',
+                    },
+                },
+            }
+            if isolate:
+                # Only the primary has a test database: the replicas would
+                # serve the real data to the requests
+                overrides['BLOG_DB_REPLICAS'] = []
+            with override_settings(**overrides):
+                report = self.run_benchmark(options)
+        finally:
+            if isolate:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run_benchmark(self, options) -> dict:
+        requests = _route_requests()
+        missing = {
+            f'blog:{pattern.name}' for pattern in blog_urls.urlpatterns
+        } - requests.keys()
+        if missing:
+            raise CommandError(
+                f"No benchmark request for: {', '.join(sorted(missing))}"
+            )
+
+        # The local memory cache of the run outlives it in this process
+        cache.clear()
+        client = Client()
+        routes = {}
+        for name, (method, url, data) in requests.items():
+            send = getattr(client, method)
+            for _ in range(options['warmup']):
+                send(url, data)
+
+            durations = []
+            queries = []
+            status_codes = set()
+            for _ in range(options['iterations']):
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = send(url, data)
+                    durations.append(time.perf_counter() - start)
+                queries.append(len(captured))
+                status_codes.add(response.status_code)
+
+            percentiles = statistics.quantiles(durations, n=100, method='inclusive')
+            routes[name] = {
+                'method': method.upper(),
+                'url': url,
+                'status_codes': sorted(status_codes),
+                'p50_ms': round(percentiles[49] * 1000, 3),
+                'p95_ms': round(percentiles[94] * 1000, 3),
+                'p99_ms': round(percentiles[98] * 1000, 3),
+                'mean_ms': round(statistics.fmean(durations) * 1000, 3),
+                'requests_per_second': round(len(durations) / sum(durations), 1),
+                'queries': round(statistics.fmean(queries), 2),
+            }
+
+        return {
+            'dataset': {
+                'posts': Post.objects.count(),
+                'tags': Tag.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'iterations': options['iterations'],
+            'routes': routes,
+        }
@@ -0,0 +1,162 @@
+import gzip
+from argparse import ArgumentTypeError
+from contextlib import ExitStack
+from datetime import datetime, time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from taggit.models import Tag, TaggedItem
+from blog.models import Comment, Post
+
+
+def aware_datetime(value: str) -> datetime:
+    """
+        A date (at midnight) or datetime, in TIME_ZONE when naive
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is not None:
+                parsed = datetime.combine(day, time())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ArgumentTypeError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def stored_fields(model) -> list[str]:
+    # Generated columns are computed again by the database on load
+    return [
+        field.name for field in model._meta.local_fields
+        if not field.primary_key and not getattr(field, 'generated', False)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the tags, posts, tagged items and comments as JSON lines, "
+        "loadable with loaddata, streamed with server-side cursors"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help="File to write, '-' for the standard output. Names ending "
+                 "with .gz are compressed.",
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help="Compress the output with gzip.",
+        )
+        parser.add_argument(
+            '--since',
+            type=aware_datetime,
+            help="Only export posts and comments updated from this date or "
+                 "datetime on, for incremental exports. Comment changes, "
+                 "moderation included, and tag changes update the posts, "
+                 "but deletions are not exported, tags removed from posts "
+                 "included.",
+        )
+        parser.add_argument(
+            '--until',
+            type=aware_datetime,
+            help="Only export posts and comments updated before this date "
+                 "or datetime.",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help="Number of rows fetched from the server-side cursors at once.",
+        )
+
+    def querysets(self, since: datetime | None, until: datetime | None):
+        """
+            Querysets of the export, in loading order. Tagged items have no
+            date, all the items of the exported posts are exported.
+        """
+        updated = {}
+        if since:
+            updated['updated__gte'] = since
+        if until:
+            updated['updated__lt'] = until
+
+        posts = Post.objects.filter(**updated)
+        items = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+        )
+        tags = Tag.objects.all()
+        if updated:
+            items = items.filter(object_id__in=posts.values('id'))
+            tags = tags.filter(id__in=items.values('tag_id'))
+        return [
+            tags.order_by('pk'),
+            posts.order_by('pk'),
+            items.order_by('pk'),
+            Comment.objects.filter(**updated).order_by('pk'),
+        ]
+
+    def handle(self, *args, **options):
+        output = options['output']
+        compress = options['gzip'] or output.endswith('.gz')
+        chunk_size = options['chunk_size']
+        totals = {}
+
+        with ExitStack() as stack:
+            if output == '-':
+                # Objects are written in pieces, with no line ending added
+                self.stdout.ending = ''
+                stream = self.stdout
+                if compress:
+                    stream = stack.enter_context(gzip.open(
+                        self.stdout.buffer, 'wt', encoding='utf-8',
+                    ))
+            elif compress:
+                stream = stack.enter_context(
+                    gzip.open(output, 'wt', encoding='utf-8')
+                )
+            else:
+                stream = stack.enter_context(
+                    open(output, 'w', encoding='utf-8')
+                )
+
+            # The server-side cursors of the tables read a single snapshot
+            snapshot = not connection.in_atomic_block
+            stack.enter_context(transaction.atomic())
+            if snapshot:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'
+                    )
+            for queryset in self.querysets(options['since'], options['until']):
+                model = queryset.model
+                totals[model._meta.label] = 0
+
+                def counted(objects, label=model._meta.label):
+                    for obj in objects:
+                        totals[label] += 1
+                        yield obj
+
+                serializers.serialize(
+                    'jsonl',
+                    counted(queryset.iterator(chunk_size=chunk_size)),
+                    stream=stream,
+                    fields=stored_fields(model),
+                )
+
+        summary = ', '.join(
+            f'{count} {label}' for label, count in totals.items()
+        )
+        # The standard output may be the export itself
+        report = self.stderr if output == '-' else self.stdout
+        report.write(self.style.SUCCESS(f"Exported {summary}."))
@@ -1,45 +1,77 @@
-from django.core.management.base import BaseCommand
-from blog.models import Post
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+from blog.drafts import save_drafts, write_drafts
+from blog.seeding import seed_dataset
 from django.conf import settings
-from django.utils.text import slugify
 from django.contrib.auth import get_user_model
-from django.utils.timezone import now
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 class Command(BaseCommand):
     help = "Generate a new blog post using AI"
 
-    def handle(self, *args, **kwargs):
-        # Set up OpenAI API client
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-        # Generate title using ChatGPT
-        title_prompt = "Generate a creative and catchy title for a tech blog post."
-        title_response = client.chat.completions.create(
-            messages=[{"role": "user", "content": title_prompt}],
-            max_tokens=10,
-            model="gpt-3.5-turbo",
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1,
+            help="Number of draft posts to generate.",
         )
-        title = title_response.choices[0].message.content.strip()
-
-        # Generate body content
-        content_prompt = f"Write a detailed blog post about '{title}'."
-        content_response = client.chat.completions.create(
-            messages=[{"role": "user", "content": content_prompt}],
-            max_tokens=100,
-            model="gpt-3.5-turbo",
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=5,
+            help="Number of drafts generated at the same time.",
         )
-        body = content_response.choices[0].message.content.strip()
-
-        # Generate tags
-        tags_prompt = f"Suggest relevant tags for a blog post about '{title}'."
-        tags_response = client.chat.completions.create(
-            messages=[{"role": "user", "content": tags_prompt}],
-            max_tokens=10,
-            model="gpt-3.5-turbo",
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=3,
+            help="Retries of a failed OpenAI request, with exponential backoff.",
+        )
+        parser.add_argument(
+            '--base-url',
+            default=settings.OPENAI_BASE_URL,
+            help="OpenAI compatible API to use instead of api.openai.com.",
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help="Generate a synthetic dataset without calling OpenAI.",
+        )
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Rows written per batch, or drafts saved per batch.",
+        )
+        parser.add_argument(
+            '--method',
+            choices=['bulk', 'copy'],
+            default='copy',
+            help="Write rows with bulk_create() or PostgreSQL COPY.",
         )
-        tags_text = tags_response.choices[0].message.content.strip()
-        tags = [tag.strip() for tag in tags_text.split(',')]
+        parser.add_argument(
+            '--no-render',
+            action='store_true',
+            help="Leave the rendered HTML empty, to fill with render_posts.",
+        )
+        parser.add_argument(
+            '--similar',
+            action='store_true',
+            help="Also build the similar posts, otherwise run "
+                 "rebuild_similar_posts afterwards.",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **kwargs):
+        if kwargs['offline']:
+            return self.generate_offline(kwargs)
+        if kwargs['count'] < 1 or kwargs['concurrency'] < 1:
+            raise CommandError("--count and --concurrency must be positive.")
 
         # Get default author
         User = get_user_model()
@@ -48,19 +80,55 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("No user found to assign as author."))
             return
 
-        # Create and save the post
-        post = Post.objects.create(
-            title=title,
-            slug=slugify(title),
-            author=default_author,
-            body=body,
-            publish=now(),
-            status=Post.Status.DRAFT,  # Save as draft
-        )
-        post.tags.add(*tags)
+        created = failed = 0
+        for start in range(0, kwargs['count'], kwargs['batch_size']):
+            results = asyncio.run(self.write_drafts(
+                min(kwargs['batch_size'], kwargs['count'] - start), kwargs,
+            ))
+            drafts = []
+            for result in results:
+                if isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f"Draft generation failed: {result}")
+                else:
+                    drafts.append(result)
+            for post in save_drafts(drafts, default_author):
+                self.stdout.write(self.style.SUCCESS(
+                    f"New draft blog post created: {post.title}"
+                ))
+            created += len(drafts)
+
+        if kwargs['count'] > 1:
+            self.stdout.write(f"{created} drafts created, {failed} failed.")
+        if failed and not created:
+            raise CommandError("No draft could be generated.")
 
-        # Save the post
-        post.save()
+    async def write_drafts(self, count: int, options) -> list:
+        async with AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=options['base_url'],
+            max_retries=options['retries'],
+        ) as client:
+            return await write_drafts(client, count, options['concurrency'])
 
-        # Output success message
-        self.stdout.write(self.style.SUCCESS(f"New draft blog post created: {title}"))
+    def generate_offline(self, options) -> None:
+        def progress(totals, rate):
+            self.stdout.write(
+                f"{totals['posts']} posts, {totals['tagged_items']} tagged "
+                f"items, {totals['comments']} comments ({rate:,.0f} rows/s)"
+            )
+
+        totals = seed_dataset(
+            options['posts'],
+            options['tags'],
+            options['comments'],
+            batch_size=options['batch_size'],
+            method=options['method'],
+            seed=options['seed'],
+            render=not options['no_render'],
+            rebuild_similar=options['similar'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals['posts']} posts and {totals['comments']} comments."
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from blog.models import Post, SimilarPost
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the precomputed similar posts of every post, among the "
+        "BLOG_SIMILAR_CANDIDATES_PER_TAG most recent posts of each tag"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of posts whose lists are rebuilt per statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        SimilarPost.objects.all().delete()
+
+        batch = []
+        total = 0
+        post_ids = Post.objects.order_by('id').values_list('id', flat=True)
+        for post_id in post_ids.iterator(chunk_size=batch_size):
+            batch.append(post_id)
+            if len(batch) >= batch_size:
+                SimilarPost.objects.rebuild(batch)
+                total += len(batch)
+                batch = []
+        SimilarPost.objects.rebuild(batch)
+        total += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt similar posts of {total} post(s).")
+        )
@@ -0,0 +1,42 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from blog.cache import invalidate_sidebar
+from blog.models import Comment, Post
+from blog.pagecache import post_dependency, purge_pages
+
+
+class Command(BaseCommand):
+    help = "Repair drift between Post.comment_count and the active comments"
+
+    def handle(self, *args, **kwargs):
+        active_comments = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'), activate=True)
+                .order_by()
+                .values('post')
+                .annotate(total=Count('id'))
+                .values('total')
+            ),
+            0,
+        )
+        drifted = Post.objects.annotate(
+            actual_count=active_comments
+        ).exclude(comment_count=F('actual_count'))
+
+        drifted_ids = list(drifted.values_list('pk', flat=True))
+        repaired = Post.objects.filter(
+            pk__in=drifted_ids
+        ).update(comment_count=active_comments)
+        if repaired:
+            invalidate_sidebar()
+            transaction.on_commit(
+                partial(purge_pages, *map(post_dependency, drifted_ids))
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired comment count of {repaired} post(s).")
+        )
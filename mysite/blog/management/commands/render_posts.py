@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Render the stored HTML body and excerpt of existing posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Re-render every post, not only the ones never rendered.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of posts written per UPDATE batch.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only('id', 'body')
+        if not options['all']:
+            posts = posts.filter(body_rendered=False)
+
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        for post in posts.order_by('id').iterator(chunk_size=batch_size):
+            post.render_body()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, ['body_html', 'excerpt', 'body_rendered'])
+                total += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, ['body_html', 'excerpt', 'body_rendered'])
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {total} post(s)."))
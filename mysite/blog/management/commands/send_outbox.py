@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from blog.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = "Send the queued emails in batches over one connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help="Number of emails sent per connection.",
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty, with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = OutgoingEmail.objects.deliver(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: {total_sent} sent, {total_failed} failed."
+        ))
@@ -0,0 +1,38 @@
+import html
+import re
+
+import markdown
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.text import Truncator
+
+# Number of words kept in the pre-computed post excerpt
+EXCERPT_WORDS = 30
+# Around the matches of search headlines, built from text without tags
+HIGHLIGHT_START = '<b>'
+HIGHLIGHT_STOP = '</b>'
+HIGHLIGHT_MARKERS = re.compile(
+    f'({re.escape(HIGHLIGHT_START)}|{re.escape(HIGHLIGHT_STOP)})'
+)
+
+
+def render_markdown(text: str) -> str:
+    return markdown.markdown(text)
+
+
+def make_excerpt(html: str, words: int = EXCERPT_WORDS) -> str:
+    return Truncator(html).words(words, html=True)
+
+
+def highlight(headline: str) -> SafeString:
+    """
+        Escape a search headline, keeping only its highlight markers as
+        HTML. The text still holds the entities of the rendered body.
+    """
+    escaped = ''.join(
+        part if part in (HIGHLIGHT_START, HIGHLIGHT_STOP)
+        else escape(html.unescape(part))
+        for part in HIGHLIGHT_MARKERS.split(headline)
+    )
+    # Stripped tags leave runs of spaces
+    return mark_safe(' '.join(escaped.split()))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.9 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_trigram_ext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.9 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_active_comments(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    Post.objects.update(
+        comment_count=Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'), activate=True)
+                .order_by()
+                .values('post')
+                .annotate(total=Count('id'))
+                .values('total')
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_body_html'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_active_comments, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-comment_count'], name='blog_post_status_d07366_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.9 on 2026-10-18 17:44
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_search_vector'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='blog_post_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.9 on 2026-10-18 17:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_title_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shared_tags', models.PositiveIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_entries', to='blog.post')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['post', 'rank'], name='blog_simila_post_id_3830aa_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarpost',
+            constraint=models.UniqueConstraint(fields=('post', 'similar'), name='blog_similarpost_unique_pair'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.9 on 2026-10-18 18:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_similarpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=250)),
+                ('body', models.TextField()),
+                ('from_email', models.CharField(blank=True, max_length=254)),
+                ('to', models.EmailField(max_length=254)),
+                ('status', models.CharField(choices=[('PD', 'Pending'), ('ST', 'Sent'), ('DD', 'Dead')], default='PD', max_length=2)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('sent', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created'],
+                'indexes': [models.Index(condition=models.Q(('status', 'PD')), fields=['next_attempt'], name='blog_outgoingemail_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.9 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('activate', True)), fields=['post', 'created', 'id'], name='blog_comment_post_active_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.9 on 2026-10-18 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_comment_post_active_idx'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'PB')), fields=['slug', 'publish'], name='blog_post_published_slug_idx'),
+        ),
+    ]
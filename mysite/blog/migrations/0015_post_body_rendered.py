@@ -0,0 +1,25 @@
+# Generated by Django 5.0.9 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+def mark_rendered(apps, schema_editor):
+    # Empty HTML was the old "not rendered" marker: render those once more
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(body_html='').update(body_rendered=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_published_slug_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_rendered',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_rendered, migrations.RunPython.noop),
+    ]
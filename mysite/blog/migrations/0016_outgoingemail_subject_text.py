@@ -0,0 +1,18 @@
+# Generated by Django 5.0.9 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_body_rendered'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='subject',
+            field=models.TextField(),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.9 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_outgoingemail_subject_text'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outgoingemail',
+            name='blog_outgoingemail_due_idx',
+        ),
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(choices=[('PD', 'Pending'), ('SD', 'Sending'), ('ST', 'Sent'), ('DD', 'Dead')], default='PD', max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(('status__in', ['PD', 'SD'])), fields=['next_attempt'], name='blog_outgoingemail_due_idx'),
+        ),
+    ]
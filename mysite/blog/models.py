@@ -1,10 +1,127 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+from functools import partial
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.contrib.contenttypes.models import ContentType
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Func, Q, Value
 from django.urls import reverse
 from django.utils import timezone
 from taggit.managers import TaggableManager
+from taggit.models import Tag, TaggedItem
+
+from .markup import (
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    make_excerpt,
+    render_markdown,
+)
+
+# Text search configuration of the stored search vector
+SEARCH_CONFIG = 'english'
+# HTML tags, including one cut at the end of the text
+HTML_TAG = '<[^>]*(>|$)'
 
-class PublishedManager(models.Manager):
+
+class PostQuerySet(models.QuerySet):
+    def without_bodies(self):
+        """
+            Skip the large text columns that listings never display
+        """
+        return self.defer('body', 'body_html', 'search_vector')
+
+    def for_listing(self):
+        """
+            Posts with everything list pages render, without N+1 queries
+        """
+        return (
+            self.without_bodies()
+            .select_related('author')
+            .prefetch_related('tags')
+        )
+
+    def published_on(self, year: int, month: int, day: int):
+        """
+            Posts published on that day of TIME_ZONE, as a half-open range
+            of ``publish`` that indexes serve, unlike ``publish__day``.
+            Raises ValueError for days that do not exist, OverflowError
+            for the last day of year 9999.
+        """
+        start = timezone.make_aware(datetime(year, month, day))
+        end = timezone.make_aware(
+            datetime.combine(start.date() + timedelta(days=1), time())
+        )
+        return self.filter(publish__gte=start, publish__lt=end)
+
+    def tagged(self, tag: Tag | str):
+        """
+            Posts with the tag, or the tag of that slug. A semi-join on
+            the integer ``object_id``: joining through ``tags`` casts it to
+            bigint for every row, which no index serves.
+        """
+        items = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.model),
+        )
+        if isinstance(tag, str):
+            items = items.filter(tag__slug=tag)
+        else:
+            items = items.filter(tag=tag)
+        return self.filter(id__in=items.values('object_id'))
+
+    def search(self, query: str, headline: bool = True):
+        """
+            Full-text search over the indexed title and body, plus fuzzy
+            title matches through the indexed trigram % operator. The
+            ``headline`` excerpts are built from the rendered bodies of the
+            results, stripped of their tags: render them with the
+            ``highlight`` filter.
+        """
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        results = (
+            self.filter(
+                Q(search_vector=search_query) | Q(title__trigram_similar=query)
+            )
+            .annotate(
+                rank=(
+                    SearchRank(F('search_vector'), search_query)
+                    + TrigramSimilarity('title', query)
+                ),
+            )
+            .order_by('-rank', '-publish')
+        )
+        if headline:
+            results = results.annotate(
+                headline=SearchHeadline(
+                    Func(
+                        F('body_html'), Value(HTML_TAG), Value(' '), Value('g'),
+                        function='regexp_replace',
+                        output_field=models.TextField(),
+                    ),
+                    search_query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_words=30,
+                    min_words=12,
+                ),
+            )
+        return results
+
+
+class PublishedManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self):
         return (
             super().get_queryset().filter(status=Post.Status.PUBLISHED)
@@ -28,6 +145,11 @@ class Post(models.Model):
         related_name='blog_posts',
     )
     body = models.TextField()
+    # Pre-rendered copies of ``body``, rebuilt on save when the body changes
+    body_html = models.TextField(blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    # Whether they were rendered, as bodies may legitimately render empty
+    body_rendered = models.BooleanField(default=False, editable=False)
     publish = models.DateTimeField(default=timezone.now)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -36,6 +158,17 @@ class Post(models.Model):
         choices=Status,
         default=Status.DRAFT,
     )
+    # Number of active comments, kept in sync by the Comment signals
+    comment_count = models.IntegerField(default=0, editable=False)
+    # Weighted full-text document, maintained by the database
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('body', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     objects = models.Manager()
     published = PublishedManager()
@@ -44,23 +177,116 @@ class Post(models.Model):
         ordering = ('-publish',)
         indexes = [
             models.Index(fields=['-publish']),
+            models.Index(fields=['status', '-comment_count']),
+            models.Index(fields=['status', '-publish', '-id']),
+            # Detail pages, see published_on()
+            models.Index(
+                fields=['slug', 'publish'],
+                name='blog_post_published_slug_idx',
+                condition=Q(status='PB'),
+            ),
+            GinIndex(fields=['search_vector']),
+            GinIndex(
+                fields=['title'],
+                name='blog_post_title_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
         ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored body, status and date to detect changes on save
+        instance._loaded_body = instance.__dict__.get('body')
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_publish = instance.__dict__.get('publish')
+        return instance
+
+    def render_body(self) -> None:
+        self.body_html = render_markdown(self.body)
+        self.excerpt = make_excerpt(self.body_html)
+        self.body_rendered = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # The body is not loaded when it was deferred, so it cannot have changed
+        body_loaded = 'body' in self.__dict__
+        if (
+            body_loaded
+            and (update_fields is None or 'body' in update_fields)
+            and (
+                self._state.adding
+                or not self.body_rendered
+                or self.body != getattr(self, '_loaded_body', None)
+            )
+        ):
+            self.render_body()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'body_html', 'excerpt', 'body_rendered'
+                }
+        super().save(*args, **kwargs)
+        if body_loaded:
+            self._loaded_body = self.body
+        if 'status' in self.__dict__:
+            self._loaded_status = self.status
+        if 'publish' in self.__dict__:
+            self._loaded_publish = self.publish
+
     def get_absolute_url(self):
+        # The day of TIME_ZONE, like the lookup of post_detail
+        publish = timezone.localtime(self.publish)
         return reverse(
             'blog:post_detail',
             args=[
-                self.publish.year,
-                self.publish.month,
-                self.publish.day,
+                publish.year,
+                publish.month,
+                publish.day,
                 self.slug,
             ],
         )
     tags = TaggableManager()
 
+class CommentQuerySet(models.QuerySet):
+    def set_active(self, activate: bool) -> int:
+        """
+            Bulk (de)activate comments keeping the post counters in sync,
+            and touching the comments and their posts like a save would
+        """
+        from .cache import invalidate_feeds, invalidate_sidebar, invalidate_sitemap
+        from .pagecache import post_dependency, purge_pages
+
+        with transaction.atomic():
+            changed = list(
+                self.exclude(activate=activate)
+                .select_for_update()
+                .values_list('id', 'post_id')
+            )
+            now = timezone.now()
+            Comment.objects.filter(
+                id__in=[comment_id for comment_id, _ in changed]
+            ).update(activate=activate, updated=now)
+
+            delta = 1 if activate else -1
+            per_post = Counter(post_id for _, post_id in changed)
+            for post_id, total in per_post.items():
+                Post.objects.filter(pk=post_id).update(
+                    comment_count=F('comment_count') + delta * total,
+                    updated=now,
+                )
+        if changed:
+            transaction.on_commit(invalidate_sidebar)
+            transaction.on_commit(invalidate_feeds)
+            transaction.on_commit(partial(invalidate_sitemap, list(per_post)))
+            transaction.on_commit(
+                partial(purge_pages, *map(post_dependency, per_post))
+            )
+        return len(changed)
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
@@ -74,11 +300,467 @@ class Comment(models.Model):
     updated = models.DateTimeField(auto_now=True)
     activate = models.BooleanField(default=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ['created']
         indexes = [
             models.Index(fields=['created']),
+            # Pages of the active comments of a post, see post_comments()
+            models.Index(
+                fields=['post', 'created', 'id'],
+                condition=Q(activate=True),
+                name='blog_comment_post_active_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Comment by {self.name} on {self.post}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state to update the post counters on save
+        if {'post_id', 'activate'} <= instance.__dict__.keys():
+            instance._loaded_counted_post_id = instance.counted_post_id
+        return instance
+
+    @property
+    def counted_post_id(self) -> int | None:
+        """
+            Id of the post whose comment_count includes this comment
+        """
+        return self.post_id if self.activate else None
+
+
+
+class SimilarPostManager(models.Manager):
+    def rebuild(self, post_ids=None) -> None:
+        """
+            Recompute the top similar posts, by number of shared tags,
+            of the given posts (or of every post). Candidates are the
+            BLOG_SIMILAR_CANDIDATES_PER_TAG most recent published posts of
+            each of their tags: a self-join of every post of a popular tag
+            would be quadratic in its size.
+        """
+        if post_ids is not None:
+            post_ids = list(post_ids)
+            if not post_ids:
+                return
+        post_filter = '' if post_ids is None else 'AND item.object_id = ANY(%s)'
+        content_type_id = ContentType.objects.get_for_model(Post).id
+        params = [
+            content_type_id,
+            *([] if post_ids is None else [post_ids]),
+            content_type_id,
+            Post.Status.PUBLISHED,
+            settings.BLOG_SIMILAR_CANDIDATES_PER_TAG,
+            content_type_id,
+            settings.BLOG_SIMILAR_POSTS,
+        ]
+        tagged_items = TaggedItem._meta.db_table
+        sql = f"""
+            WITH source AS (
+                SELECT item.object_id, item.tag_id
+                FROM {tagged_items} item
+                JOIN {Post._meta.db_table} source ON source.id = item.object_id
+                WHERE item.content_type_id = %s
+                    {post_filter}
+            ), recent AS (
+                SELECT tag_id, object_id FROM (
+                    SELECT
+                        item.tag_id,
+                        item.object_id,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY item.tag_id
+                            ORDER BY candidate.publish DESC, candidate.id DESC
+                        ) AS position
+                    FROM {tagged_items} item
+                    JOIN {Post._meta.db_table} candidate ON candidate.id = item.object_id
+                    WHERE item.content_type_id = %s
+                        AND candidate.status = %s
+                        AND item.tag_id IN (SELECT tag_id FROM source)
+                ) numbered
+                WHERE position <= %s
+            ), pairs AS (
+                SELECT DISTINCT
+                    source.object_id AS post_id,
+                    recent.object_id AS similar_id
+                FROM source
+                JOIN recent
+                    ON recent.tag_id = source.tag_id
+                    AND recent.object_id <> source.object_id
+            )
+            INSERT INTO {self.model._meta.db_table}
+                (post_id, similar_id, shared_tags, rank)
+            SELECT post_id, similar_id, shared_tags, rank FROM (
+                SELECT
+                    pairs.post_id,
+                    pairs.similar_id,
+                    COUNT(*) AS shared_tags,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY pairs.post_id
+                        ORDER BY COUNT(*) DESC, candidate.publish DESC, candidate.id DESC
+                    ) AS rank
+                FROM pairs
+                JOIN source a ON a.object_id = pairs.post_id
+                JOIN {tagged_items} b
+                    ON b.object_id = pairs.similar_id
+                    AND b.content_type_id = %s
+                    AND b.tag_id = a.tag_id
+                JOIN {Post._meta.db_table} candidate ON candidate.id = pairs.similar_id
+                GROUP BY pairs.post_id, pairs.similar_id, candidate.publish, candidate.id
+            ) ranked
+            WHERE rank <= %s
+        """
+        with transaction.atomic():
+            entries = self.all()
+            if post_ids is not None:
+                entries = entries.filter(post_id__in=post_ids)
+            entries.delete()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+        self._purge_pages(post_ids)
+
+    def _purge_pages(self, post_ids=None) -> None:
+        """
+            Drop the cached pages showing the lists of the given posts (or
+            of every post), once committed
+        """
+        from .pagecache import SIMILAR_POSTS, purge_pages, similar_dependency
+
+        if post_ids is None:
+            dependencies = [SIMILAR_POSTS]
+        else:
+            dependencies = map(similar_dependency, post_ids)
+        transaction.on_commit(partial(purge_pages, *dependencies))
+
+    def full_lists(self, post_ids) -> set[int]:
+        """
+            Posts among the given ones whose list is at the size limit, so
+            may have left out other candidates
+        """
+        return set(
+            self.filter(post_id__in=list(post_ids))
+            .values('post_id')
+            .annotate(size=Count('id'))
+            .filter(size__gte=settings.BLOG_SIMILAR_POSTS)
+            .values_list('post_id', flat=True)
+        )
+
+    def _rerank(self, post_ids) -> None:
+        """
+            Renumber the given lists by score and trim them to the limit
+        """
+        table = self.model._meta.db_table
+        sql = f"""
+            WITH ranked AS (
+                SELECT
+                    entry.id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY entry.post_id
+                        ORDER BY entry.shared_tags DESC, candidate.publish DESC, candidate.id DESC
+                    ) AS rank
+                FROM {table} entry
+                JOIN {Post._meta.db_table} candidate ON candidate.id = entry.similar_id
+                WHERE entry.post_id = ANY(%s)
+            ), trimmed AS (
+                DELETE FROM {table}
+                WHERE id IN (SELECT id FROM ranked WHERE rank > %s)
+            )
+            UPDATE {table} entry SET rank = ranked.rank
+            FROM ranked
+            WHERE entry.id = ranked.id
+                AND ranked.rank <= %s
+                AND entry.rank <> ranked.rank
+        """
+        limit = settings.BLOG_SIMILAR_POSTS
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [list(post_ids), limit, limit])
+
+    def add_candidate(self, post: Post, tag_ids) -> None:
+        """
+            Insert a published post into the lists of the posts sharing one
+            of the given tags with it, after it gained them or was published.
+            Its scores only go up, so the lists are updated in place instead
+            of being recomputed from every tag. Only the lists it enters are
+            written: those not full, those already holding it, and those
+            whose last entry ranks below it. Popular tags are on most posts,
+            whose full lists a weak candidate leaves untouched.
+        """
+        tag_ids = list(tag_ids)
+        if not tag_ids:
+            return
+        content_type_id = ContentType.objects.get_for_model(Post).id
+        tagged_items = TaggedItem._meta.db_table
+        table = self.model._meta.db_table
+        sql = f"""
+            WITH scores AS (
+                SELECT b.object_id AS post_id, COUNT(*) AS shared_tags
+                FROM {tagged_items} a
+                JOIN {tagged_items} b
+                    ON b.tag_id = a.tag_id
+                    AND b.content_type_id = a.content_type_id
+                    AND b.object_id <> a.object_id
+                WHERE a.content_type_id = %s
+                    AND a.object_id = %s
+                    AND b.object_id IN (
+                        SELECT object_id FROM {tagged_items}
+                        WHERE content_type_id = %s AND tag_id = ANY(%s)
+                    )
+                GROUP BY b.object_id
+            )
+            INSERT INTO {table} (post_id, similar_id, shared_tags, rank)
+            SELECT scores.post_id, %s, scores.shared_tags, 0
+            FROM scores
+            LEFT JOIN {table} last
+                ON last.post_id = scores.post_id AND last.rank = %s
+            LEFT JOIN {Post._meta.db_table} last_similar
+                ON last_similar.id = last.similar_id
+            WHERE last.id IS NULL
+                OR last.similar_id = %s
+                OR (scores.shared_tags, %s::timestamptz, %s)
+                    > (last.shared_tags, last_similar.publish, last_similar.id)
+                OR EXISTS (
+                    SELECT 1 FROM {table} entry
+                    WHERE entry.post_id = scores.post_id
+                        AND entry.similar_id = %s
+                )
+            ON CONFLICT (post_id, similar_id)
+                DO UPDATE SET shared_tags = EXCLUDED.shared_tags
+            RETURNING post_id
+        """
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [
+                    content_type_id, post.pk, content_type_id, tag_ids,
+                    post.pk, settings.BLOG_SIMILAR_POSTS,
+                    post.pk, post.publish, post.pk, post.pk,
+                ])
+                entered = [post_id for post_id, in cursor.fetchall()]
+            self._rerank(entered)
+        self._purge_pages(entered)
+
+    def remove_candidate(self, post: Post) -> None:
+        """
+            Lower the scores of a post in the lists it appears in, after it
+            lost tags or was unpublished. Only full lists where it fell to
+            the last place, or out, may have left out a better post and are
+            recomputed.
+        """
+        entries = self.filter(similar=post)
+        with transaction.atomic():
+            holders = set(entries.values_list('post_id', flat=True))
+            if not holders:
+                return
+            full = self.full_lists(holders)
+            if post.status == Post.Status.PUBLISHED:
+                sql = f"""
+                    UPDATE {self.model._meta.db_table} entry SET shared_tags = (
+                        SELECT COUNT(*)
+                        FROM {TaggedItem._meta.db_table} a
+                        JOIN {TaggedItem._meta.db_table} b
+                            ON b.tag_id = a.tag_id
+                            AND b.content_type_id = a.content_type_id
+                        WHERE a.content_type_id = %s
+                            AND a.object_id = entry.similar_id
+                            AND b.object_id = entry.post_id
+                    )
+                    WHERE entry.similar_id = %s
+                """
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [
+                        ContentType.objects.get_for_model(Post).id, post.pk,
+                    ])
+                entries.filter(shared_tags=0).delete()
+            else:
+                entries.delete()
+            self._rerank(holders)
+            kept = entries.filter(
+                post_id__in=full, rank__lt=settings.BLOG_SIMILAR_POSTS,
+            ).values_list('post_id', flat=True)
+            self.rebuild(full - set(kept))
+        self._purge_pages(holders)
+
+
+class SimilarPost(models.Model):
+    """
+        Precomputed similar posts, maintained from tag changes
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='similar_entries',
+    )
+    similar = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    shared_tags = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+
+    objects = SimilarPostManager()
+
+    class Meta:
+        ordering = ['rank']
+        indexes = [
+            models.Index(fields=['post', 'rank']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'similar'],
+                name='blog_similarpost_unique_pair',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.similar} similar to {self.post}'
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+    def due(self):
+        # Emails still sending past their claim were left by a dead worker
+        return self.filter(
+            status__in=[OutgoingEmail.Status.PENDING, OutgoingEmail.Status.SENDING],
+            next_attempt__lte=timezone.now(),
+        )
+
+    def deliver(self, batch_size: int) -> tuple[int, int]:
+        """
+            Send up to ``batch_size`` due emails over a single connection
+            and return the numbers of sent and failed ones. Failures are
+            retried with an exponential backoff until the last attempt,
+            which marks the email as dead. The emails are claimed for
+            BLOG_OUTBOX_CLAIM_TIMEOUT seconds in a first transaction, so
+            that concurrent workers skip them, sent outside of any, and
+            their outcomes saved in a second one.
+        """
+        sent = failed = 0
+        claimed_until = timezone.now() + timedelta(
+            seconds=settings.BLOG_OUTBOX_CLAIM_TIMEOUT
+        )
+        with transaction.atomic():
+            emails = list(
+                self.due()
+                .select_for_update(skip_locked=True)
+                .order_by('next_attempt', 'id')[:batch_size]
+            )
+            if not emails:
+                return sent, failed
+            OutgoingEmail.objects.filter(
+                id__in=[email.id for email in emails]
+            ).update(
+                status=OutgoingEmail.Status.SENDING,
+                next_attempt=claimed_until,
+            )
+
+        # Emails attempted before a connection failure, counted already
+        attempted = set()
+        try:
+            with get_connection() as email_connection:
+                for email in emails:
+                    attempted.add(email.id)
+                    try:
+                        email.message(email_connection).send()
+                    except Exception as e:
+                        email.record_failure(e)
+                        failed += 1
+                    else:
+                        email.record_delivery()
+                        sent += 1
+        except Exception as e:
+            # The connection itself failed, to open or to close
+            for email in emails:
+                if email.id not in attempted:
+                    email.record_failure(e)
+                    failed += 1
+
+        with transaction.atomic():
+            # Past their claim, the emails belong to the worker claiming
+            # them again
+            claimed = set(
+                OutgoingEmail.objects.filter(
+                    id__in=[email.id for email in emails],
+                    status=OutgoingEmail.Status.SENDING,
+                    next_attempt=claimed_until,
+                )
+                .select_for_update()
+                .values_list('id', flat=True)
+            )
+            OutgoingEmail.objects.bulk_update(
+                [email for email in emails if email.id in claimed],
+                ['status', 'attempts', 'next_attempt', 'last_error', 'sent'],
+            )
+        return sent, failed
+
+
+class OutgoingEmail(models.Model):
+    """
+        Outbox of emails, sent by the send_outbox command
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PD', 'Pending'
+        # Claimed by a worker until next_attempt
+        SENDING = 'SD', 'Sending'
+        SENT = 'ST', 'Sent'
+        DEAD = 'DD', 'Dead'
+
+    # Names the sender and the post, with no bound on their lengths
+    subject = models.TextField()
+    body = models.TextField()
+    # Blank for settings.DEFAULT_FROM_EMAIL
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.EmailField()
+    status = models.CharField(
+        max_length=2,
+        choices=Status,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['next_attempt'],
+                name='blog_outgoingemail_due_idx',
+                condition=Q(status__in=['PD', 'SD']),
+            ),
         ]
 
     def __str__(self):
-        return f'Comment by {self.name} on {self.post}'
\ No newline at end of file
+        return f'{self.subject} to {self.to}'
+
+    def message(self, connection=None) -> EmailMessage:
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email or None,
+            to=[self.to],
+            connection=connection,
+        )
+
+    def record_delivery(self) -> None:
+        self.status = self.Status.SENT
+        self.attempts += 1
+        self.last_error = ''
+        self.sent = timezone.now()
+
+    def record_failure(self, error: Exception) -> None:
+        self.attempts += 1
+        self.last_error = f'{type(error).__name__}: {error}'
+        if self.attempts >= settings.BLOG_OUTBOX_MAX_ATTEMPTS:
+            self.status = self.Status.DEAD
+        else:
+            self.status = self.Status.PENDING
+            self.next_attempt = timezone.now() + timedelta(
+                seconds=settings.BLOG_OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1)
+            )
@@ -0,0 +1,220 @@
+"""
+Full-page cache of the blog pages for anonymous readers.
+
+While a cached view runs, it declares what the page shows with
+``depends_on()``: ``post:<id>`` for a post, ``tag:<slug>`` for the posts of a
+tag, ``posts`` for the set and order of the published posts, and
+``similar:<id>`` or ``similar`` for the similar posts of one post or of all
+of them. Every dependency has a version, the time of its last purge, and a
+cached page is only served while all of its dependencies are older than the
+page. Purging a dependency with ``purge_pages()`` thus drops exactly the
+pages showing it, with any cache backend, local memory and file caches
+included.
+
+Pages to cache are rendered from the primary database, see
+mysite.routers.primary_reads(), and cached per URL keeping only the query
+parameters of PAGE_PARAMETERS, so that other ones cannot multiply the
+entries.
+
+The sidebar is not tracked: pages also expire after
+BLOG_PAGE_CACHE_TIMEOUT seconds, like the cached sidebar after
+BLOG_SIDEBAR_CACHE_TIMEOUT.
+"""
+import hashlib
+import re
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, urlencode
+from mysite.routers import primary_reads
+
+_dependencies = ContextVar('page_dependencies', default=None)
+
+POSTS = 'posts'
+SIMILAR_POSTS = 'similar'
+# Query parameters read by the cached views
+PAGE_PARAMETERS = ('cursor', 'page', 'query')
+# Token of the comment form, replaced by the token of each reader
+CSRF_INPUT = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = rb'\1__csrf_token__\2'
+
+
+def post_dependency(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def tag_dependency(tag_slug: str) -> str:
+    return f'tag:{tag_slug}'
+
+
+def similar_dependency(post_id: int) -> str:
+    return f'similar:{post_id}'
+
+
+def _version_key(dependency: str) -> str:
+    return f'blog_page_dependency_{dependency}'
+
+
+def _page_key(request: HttpRequest) -> str:
+    query = urlencode([
+        (name, request.GET[name]) for name in PAGE_PARAMETERS
+        if name in request.GET
+    ])
+    url = f'{request.build_absolute_uri(request.path)}?{query}'.encode()
+    return f'blog_page_{hashlib.md5(url, usedforsecurity=False).hexdigest()}'
+
+
+def depends_on(*dependencies: str) -> None:
+    """
+        Record dependencies of the page being rendered, if it is cached
+    """
+    collected = _dependencies.get()
+    if collected is not None:
+        collected.update(dependencies)
+
+
+def purge_pages(*dependencies: str) -> None:
+    """
+        Drop the cached pages depending on any of the given dependencies
+    """
+    now = time.time_ns()
+    cache.set_many(
+        {_version_key(dependency): now for dependency in dependencies}, None,
+    )
+
+
+def _is_fresh(entry: dict, versions: dict) -> bool:
+    # A dependency whose version was evicted may have changed since
+    return len(versions) == len(entry['dependencies']) and all(
+        version <= entry['rendered'] for version in versions.values()
+    )
+
+
+def _cached_response(request: HttpRequest, entry: dict) -> HttpResponse:
+    headers = entry['headers']
+    last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+    response = get_conditional_response(
+        request, etag=headers.get('ETag'), last_modified=last_modified,
+    )
+    if response is None:
+        content = entry['content']
+        if entry['csrf']:
+            content = content.replace(
+                b'__csrf_token__', get_token(request).encode(),
+            )
+        response = HttpResponse(content)
+    for header, value in headers.items():
+        response.headers.setdefault(header, value)
+    return response
+
+
+def _cacheable(request: HttpRequest) -> bool:
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        # Readers who just wrote get pages rendered from the primary
+        and settings.BLOG_PRIMARY_COOKIE not in request.COOKIES
+        and bool(settings.BLOG_PAGE_CACHE_TIMEOUT)
+    )
+
+
+def _entry(response: HttpResponse, rendered: int, dependencies: set[str]) -> dict:
+    content, csrf = CSRF_INPUT.subn(CSRF_PLACEHOLDER, response.content)
+    return {
+        'content': content,
+        'csrf': bool(csrf),
+        'headers': {
+            header: response[header]
+            for header in ('Content-Type', 'ETag', 'Last-Modified')
+            if response.has_header(header)
+        },
+        'rendered': rendered,
+        'dependencies': sorted(dependencies),
+    }
+
+
+def _storable(response: HttpResponse) -> bool:
+    return response.status_code == 200 and not response.streaming
+
+
+def cache_anonymous_page(view):
+    """
+        Serve the GET requests of readers without a session from the
+        cache, revalidating with the ETag and Last-Modified of the page.
+        Async views use the async cache API.
+    """
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if not _cacheable(request):
+                return await view(request, *args, **kwargs)
+
+            key = _page_key(request)
+            entry = await cache.aget(key)
+            if entry is not None and _is_fresh(entry, await cache.aget_many(
+                map(_version_key, entry['dependencies'])
+            )):
+                return _cached_response(request, entry)
+
+            rendered = time.time_ns()
+            token = _dependencies.set(set())
+            try:
+                with primary_reads():
+                    response = await view(request, *args, **kwargs)
+                dependencies = _dependencies.get()
+            finally:
+                _dependencies.reset(token)
+            if _storable(response):
+                # Dependencies never purged yet get the version of the page
+                for dependency in dependencies:
+                    await cache.aadd(_version_key(dependency), rendered, None)
+                await cache.aset(
+                    key,
+                    _entry(response, rendered, dependencies),
+                    settings.BLOG_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not _cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = _page_key(request)
+        entry = cache.get(key)
+        if entry is not None and _is_fresh(entry, cache.get_many(
+            map(_version_key, entry['dependencies'])
+        )):
+            return _cached_response(request, entry)
+
+        rendered = time.time_ns()
+        token = _dependencies.set(set())
+        try:
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            dependencies = _dependencies.get()
+        finally:
+            _dependencies.reset(token)
+        if _storable(response):
+            # Dependencies never purged yet get the version of the page
+            for dependency in dependencies:
+                cache.add(_version_key(dependency), rendered, None)
+            cache.set(
+                key,
+                _entry(response, rendered, dependencies),
+                settings.BLOG_PAGE_CACHE_TIMEOUT,
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,314 @@
+"""
+Synthetic datasets of posts, tags and comments for benchmarks and
+capacity tests.
+
+Rows are generated and written batch by batch, either with bulk_create()
+or with PostgreSQL COPY, so that memory stays flat for millions of rows:
+only the ids, comment weights and comment counts of the posts are kept,
+in arrays, to draw the comments from the whole dataset.
+"""
+import random
+import time
+from array import array
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from .cache import invalidate_feeds, invalidate_sidebar, invalidate_sitemap
+from .models import Comment, Post, SimilarPost
+
+WORDS = (
+    'django python query index cache cursor template render request '
+    'database server latency async search tag comment feed sitemap '
+    'markdown pool replica benchmark profile memory thread worker '
+    'postgres vacuum planner scan join aggregate throughput deploy '
+    'container queue signal middleware migration schema model view'
+).split()
+
+# Share of generated posts left as drafts
+DRAFT_RATIO = 0.05
+# Share of generated comments awaiting moderation
+INACTIVE_COMMENT_RATIO = 0.1
+# Publish dates are spread over this period
+PUBLISH_PERIOD = timedelta(days=5 * 365)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _paragraph(rng: random.Random) -> str:
+    return ' '.join(
+        f'{_sentence(rng, rng.randint(6, 18))}.'
+        for _ in range(rng.randint(2, 6))
+    )
+
+
+def _body(rng: random.Random) -> str:
+    """
+        Markdown body with headings, paragraphs, lists, links and code
+    """
+    blocks = [_paragraph(rng)]
+    for _ in range(rng.randint(1, 4)):
+        blocks.append(f'## {_sentence(rng, rng.randint(2, 6))}')
+        blocks.append(_paragraph(rng))
+        kind = rng.random()
+        if kind < 0.3:
+            blocks.append('\n'.join(
+                f'- {_sentence(rng, rng.randint(3, 8))}'
+                for _ in range(rng.randint(2, 5))
+            ))
+        elif kind < 0.5:
+            word = rng.choice(WORDS)
+            blocks.append(f'    {word} = load_{word}()\n    print({word})')
+        elif kind < 0.7:
+            word = rng.choice(WORDS)
+            blocks.append(
+                f'See [{word}](https://example.com/{word}) for **details**.'
+            )
+    return '\n\n'.join(blocks)
+
+
+class DatasetGenerator:
+    def __init__(self, tags: list[Tag], author_id: int, seed: int = 0,
+                 render: bool = True, first_number: int = 0):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.tags = tags
+        # Zipf-like tag popularity: a few tags are on most posts
+        self.tag_weights = [1 / (rank + 1) ** 1.1 for rank in range(len(tags))]
+        self.author_id = author_id
+        self.render = render
+        # Slugs of earlier datasets are numbered below
+        self.first_number = first_number
+        self.now = timezone.now()
+
+    def posts(self, start: int, count: int) -> list[Post]:
+        rng = self.rng
+        posts = []
+        for i in range(start, start + count):
+            status = (
+                Post.Status.DRAFT if rng.random() < DRAFT_RATIO
+                else Post.Status.PUBLISHED
+            ).value
+            post = Post(
+                title=_sentence(rng, rng.randint(3, 9)),
+                slug=f'generated-post-{self.first_number + i}',
+                author_id=self.author_id,
+                body=_body(rng),
+                publish=self.now - PUBLISH_PERIOD * rng.random(),
+                created=self.now,
+                updated=self.now,
+                status=status,
+            )
+            if self.render:
+                post.render_body()
+            posts.append(post)
+        return posts
+
+    def post_tags(self, posts: list[Post]) -> list[tuple[int, int]]:
+        """
+            (post id, tag id) pairs, 1 to 5 distinct tags per post
+        """
+        pairs = []
+        if not self.tags:
+            return pairs
+        for post in posts:
+            chosen = self.rng.choices(
+                self.tags, self.tag_weights, k=self.rng.randint(1, 5)
+            )
+            pairs.extend((post.id, tag_id) for tag_id in {t.id for t in chosen})
+        return pairs
+
+    def popularity(self, count: int):
+        """
+            Comment weights of ``count`` posts: a few are very popular
+        """
+        for _ in range(count):
+            yield self.rng.paretovariate(1.5)
+
+    def comment_targets(self, cum_weights, count: int, chunk_size: int):
+        """
+            (post index, active) of ``count`` comments, drawn from every
+            post by weight. The same on every call, so that the comments
+            can be counted before the posts are written.
+        """
+        rng = random.Random(self.seed)
+        indexes = range(len(cum_weights))
+        for start in range(0, count, chunk_size):
+            targets = rng.choices(
+                indexes, cum_weights=cum_weights,
+                k=min(chunk_size, count - start),
+            )
+            for index in targets:
+                yield index, rng.random() >= INACTIVE_COMMENT_RATIO
+
+    def comments(self, targets, post_ids, start: int) -> list[Comment]:
+        rng = self.rng
+        return [
+            Comment(
+                post_id=post_ids[index],
+                name=f'Reader {i}',
+                email=f'reader{i}@example.com',
+                body=_paragraph(rng),
+                created=self.now,
+                updated=self.now,
+                activate=activate,
+            )
+            for i, (index, activate) in enumerate(targets, start)
+        ]
+
+
+POST_COLUMNS = (
+    'id', 'title', 'slug', 'author_id', 'body', 'body_html', 'excerpt',
+    'body_rendered', 'publish', 'created', 'updated', 'status',
+    'comment_count',
+)
+COMMENT_COLUMNS = (
+    'post_id', 'name', 'email', 'body', 'created', 'updated', 'activate',
+)
+
+
+def _copy(table: str, columns: tuple[str, ...], rows) -> None:
+    sql = f'COPY {table} ({", ".join(columns)}) FROM STDIN'
+    with connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _reserve_post_ids(count: int) -> list[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [Post._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _write_posts_bulk(posts, pairs_for, batch_size) -> int:
+    Post.objects.bulk_create(posts, batch_size=batch_size)
+    pairs = pairs_for(posts)
+    content_type = ContentType.objects.get_for_model(Post)
+    TaggedItem.objects.bulk_create(
+        [
+            TaggedItem(content_type=content_type, object_id=post_id, tag_id=tag_id)
+            for post_id, tag_id in pairs
+        ],
+        batch_size=batch_size,
+    )
+    return len(pairs)
+
+
+def _write_posts_copy(posts, pairs_for, batch_size) -> int:
+    for post, post_id in zip(posts, _reserve_post_ids(len(posts))):
+        post.id = post_id
+    _copy(Post._meta.db_table, POST_COLUMNS, (
+        [getattr(post, column) for column in POST_COLUMNS] for post in posts
+    ))
+    pairs = pairs_for(posts)
+    content_type_id = ContentType.objects.get_for_model(Post).id
+    _copy(
+        TaggedItem._meta.db_table,
+        ('object_id', 'content_type_id', 'tag_id'),
+        ((post_id, content_type_id, tag_id) for post_id, tag_id in pairs),
+    )
+    return len(pairs)
+
+
+def _write_comments_bulk(comments, batch_size) -> None:
+    Comment.objects.bulk_create(comments, batch_size=batch_size)
+
+
+def _write_comments_copy(comments, batch_size) -> None:
+    _copy(Comment._meta.db_table, COMMENT_COLUMNS, (
+        [getattr(comment, column) for column in COMMENT_COLUMNS]
+        for comment in comments
+    ))
+
+
+def seed_dataset(posts: int, tags: int, comments: int,
+                 batch_size: int = 1000, method: str = 'bulk',
+                 seed: int = 0, render: bool = True,
+                 rebuild_similar: bool = True, progress=None) -> dict:
+    """
+        Generate posts, tags, tagged items and comments in batches.
+        ``progress`` is called after each batch with the running totals.
+    """
+    write_posts, write_comments = {
+        'bulk': (_write_posts_bulk, _write_comments_bulk),
+        'copy': (_write_posts_copy, _write_comments_copy),
+    }[method]
+    author, _ = get_user_model().objects.get_or_create(username='seed')
+
+    slugs = [f'seed-tag-{i}' for i in range(tags)]
+    Tag.objects.bulk_create(
+        [Tag(name=slug, slug=slug) for slug in slugs],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    generator = DatasetGenerator(
+        list(Tag.objects.filter(slug__in=slugs).order_by('id')),
+        author.id,
+        seed=seed,
+        render=render,
+        # Ids are never reused, so no earlier slug is numbered as high
+        first_number=(Post.objects.aggregate(last=Max('id'))['last'] or 0) + 1,
+    )
+
+    totals = {'posts': 0, 'tagged_items': 0, 'comments': 0}
+    start_time = time.perf_counter()
+
+    def report():
+        if progress:
+            elapsed = time.perf_counter() - start_time
+            progress(totals, sum(totals.values()) / elapsed)
+
+    # Comments are drawn from every post, so that popular posts stand
+    # out dataset-wide, and counted first to write the posts' counters
+    if not posts:
+        comments = 0
+    cum_weights = array('d', accumulate(generator.popularity(posts)))
+    comment_counts = array('l', bytes(array('l').itemsize * posts))
+    targets = generator.comment_targets(cum_weights, comments, batch_size)
+    for index, activate in targets:
+        comment_counts[index] += activate
+
+    post_ids = array('q')
+    for start in range(0, posts, batch_size):
+        batch = generator.posts(start, min(batch_size, posts - start))
+        counts = comment_counts[start:start + len(batch)]
+        for post, comment_count in zip(batch, counts):
+            post.comment_count = comment_count
+        with transaction.atomic():
+            totals['tagged_items'] += write_posts(
+                batch, generator.post_tags, batch_size,
+            )
+        post_ids.extend(post.id for post in batch)
+        totals['posts'] += len(batch)
+        report()
+
+    targets = generator.comment_targets(cum_weights, comments, batch_size)
+    for start in range(0, comments, batch_size):
+        batch = generator.comments(
+            islice(targets, batch_size), post_ids, start,
+        )
+        with transaction.atomic():
+            write_comments(batch, batch_size)
+        totals['comments'] += len(batch)
+        report()
+
+    if rebuild_similar:
+        for start in range(0, len(post_ids), batch_size):
+            SimilarPost.objects.rebuild(list(post_ids[start:start + batch_size]))
+    invalidate_sidebar()
+    invalidate_sitemap(post_ids)
+    invalidate_feeds()
+    return totals
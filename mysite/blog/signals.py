@@ -0,0 +1,192 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+from taggit.models import Tag
+
+from .cache import invalidate_feeds, invalidate_sidebar, invalidate_sitemap
+from .models import Comment, Post, SimilarPost
+from .pagecache import POSTS, post_dependency, purge_pages, tag_dependency
+
+
+def _add_to_comment_count(post_id: int | None, delta: int) -> None:
+    if post_id is not None:
+        Post.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + delta
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs) -> None:
+    if raw:
+        return
+    if created:
+        old_post_id = None
+    elif hasattr(instance, '_loaded_counted_post_id'):
+        old_post_id = instance._loaded_counted_post_id
+    else:
+        # Previous state unknown, left to reconcile_comment_counts
+        return
+    new_post_id = instance.counted_post_id
+    if old_post_id != new_post_id:
+        _add_to_comment_count(old_post_id, -1)
+        _add_to_comment_count(new_post_id, 1)
+    instance._loaded_counted_post_id = new_post_id
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs) -> None:
+    _add_to_comment_count(
+        getattr(instance, '_loaded_counted_post_id', instance.counted_post_id),
+        -1,
+    )
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_similar_posts_on_tags(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    if reverse or not isinstance(instance, Post):
+        return
+    if action == 'post_add' and pk_set:
+        SimilarPost.objects.rebuild([instance.pk])
+        # Only posts sharing the new tags score higher against this one
+        if instance.status == Post.Status.PUBLISHED:
+            SimilarPost.objects.add_candidate(instance, pk_set)
+    elif action == 'post_remove' and pk_set or action == 'post_clear':
+        SimilarPost.objects.rebuild([instance.pk])
+        SimilarPost.objects.remove_candidate(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def touch_post_on_tags(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    # The tags are shown with the post, so they are part of its version
+    if reverse or not isinstance(instance, Post):
+        return
+    if action == 'pre_clear':
+        instance._cleared_tag_slugs = list(
+            instance.tags.values_list('slug', flat=True)
+        )
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        instance.updated = timezone.now()
+        Post.objects.filter(pk=instance.pk).update(updated=instance.updated)
+        if instance.status != Post.Status.PUBLISHED:
+            return
+        transaction.on_commit(invalidate_feeds)
+        if action == 'post_clear':
+            slugs = instance.__dict__.pop('_cleared_tag_slugs', [])
+        else:
+            slugs = Tag.objects.filter(pk__in=pk_set).values_list('slug', flat=True)
+        transaction.on_commit(partial(
+            purge_pages, post_dependency(instance.pk), *map(tag_dependency, slugs),
+        ))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_post_on_comments(sender, instance, raw=False, **kwargs) -> None:
+    # The comments are shown with the post, so they are part of its version
+    if raw:
+        return
+    Post.objects.filter(pk=instance.post_id).update(updated=timezone.now())
+    transaction.on_commit(invalidate_feeds)
+    transaction.on_commit(partial(invalidate_sitemap, [instance.post_id]))
+
+
+@receiver(post_save, sender=Post)
+def refresh_similar_posts_on_status(sender, instance, created, raw, **kwargs) -> None:
+    if raw or created or 'status' not in instance.__dict__:
+        return
+    if instance.status == getattr(instance, '_loaded_status', instance.status):
+        return
+    if instance.status == Post.Status.PUBLISHED:
+        SimilarPost.objects.add_candidate(
+            instance, instance.tags.values_list('id', flat=True)
+        )
+    else:
+        SimilarPost.objects.remove_candidate(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def collect_similar_posts(sender, instance, **kwargs) -> None:
+    # Lists below the limit already hold every other candidate
+    instance._similar_to_post_ids = SimilarPost.objects.full_lists(
+        SimilarPost.objects.filter(similar=instance)
+        .values_list('post_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def refresh_similar_posts_on_delete(sender, instance, **kwargs) -> None:
+    SimilarPost.objects.rebuild(
+        getattr(instance, '_similar_to_post_ids', [])
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def clear_sidebar_cache(sender, **kwargs) -> None:
+    # Once committed, or a render in between would cache the old counts
+    transaction.on_commit(invalidate_sidebar)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def clear_sitemap_cache(sender, instance, **kwargs) -> None:
+    # Once committed, and with the id that a deletion is about to clear
+    transaction.on_commit(partial(invalidate_sitemap, [instance.pk]))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def clear_feed_cache(sender, instance, **kwargs) -> None:
+    # Only published posts, or posts just unpublished, are in the feeds
+    if Post.Status.PUBLISHED in (
+        instance.status,
+        getattr(instance, '_loaded_status', instance.status),
+    ):
+        transaction.on_commit(invalidate_feeds)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, signal, created=False, **kwargs) -> None:
+    dependencies = [post_dependency(instance.pk)]
+    old_status = getattr(instance, '_loaded_status', instance.status)
+    # The lists change when a published post is added, removed or moved
+    if Post.Status.PUBLISHED in (instance.status, old_status) and (
+        created
+        or signal is post_delete
+        or instance.status != old_status
+        or instance.publish != getattr(instance, '_loaded_publish', instance.publish)
+    ):
+        dependencies.append(POSTS)
+    # Once committed, or a render in between would cache the old page
+    transaction.on_commit(partial(purge_pages, *dependencies))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs) -> None:
+    transaction.on_commit(partial(purge_pages, post_dependency(instance.post_id)))
+
+
+@receiver(connection_created)
+def set_trigram_threshold(sender, connection, **kwargs) -> None:
+    # Threshold of the trigram % operator used by Post.published.search()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.similarity_threshold', %s, false)",
+                [str(settings.BLOG_SEARCH_TRIGRAM_THRESHOLD)],
+            )
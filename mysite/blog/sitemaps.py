@@ -1,12 +1,109 @@
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps.views import SitemapIndexItem, x_robots_tag
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import Http404, HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import http_date
+from mysite.routers import primary_reads
+
+from .cache import SITEMAP_INDEX, sitemap_section_key
 from .models import Post
 
+
 class PostSitemaps(Sitemap):
+    """
+        Published posts of one section, the posts whose id is in
+        [section * BLOG_SITEMAP_SECTION_SIZE, (section + 1) * BLOG_SITEMAP_SECTION_SIZE)
+    """
     changefreq = 'weekly'
     priority = 0.9
 
+    def __init__(self, section: int):
+        self.section = section
+
     def items(self) -> list[Post]:
-        return Post.published.all()
-    
+        size = settings.BLOG_SITEMAP_SECTION_SIZE
+        return (
+            Post.published
+            .filter(id__gte=self.section * size, id__lt=(self.section + 1) * size)
+            .only('id', 'slug', 'publish', 'updated')
+            .order_by('id')
+        )
+
     def lastmod(self, obj) -> str:
-        return obj.updated
\ No newline at end of file
+        return obj.updated
+
+
+def _last_modified(response: HttpResponse, last_mod) -> HttpResponse:
+    if last_mod is not None:
+        response['Last-Modified'] = http_date(last_mod.timestamp())
+    return response
+
+
+def _sections() -> dict:
+    """
+        Sections holding published posts, to their last modification
+    """
+    sections = cache.get(SITEMAP_INDEX)
+    if sections is None:
+        with primary_reads():
+            sections = {
+                entry['section']: entry['last_mod']
+                for entry in Post.published.order_by()
+                .annotate(section=F('id') / settings.BLOG_SITEMAP_SECTION_SIZE)
+                .values('section')
+                .annotate(last_mod=Max('updated'))
+                .order_by('section')
+            }
+        cache.set(SITEMAP_INDEX, sections, settings.BLOG_SITEMAP_CACHE_TIMEOUT)
+    return sections
+
+
+@x_robots_tag
+def sitemap_index(request: HttpRequest) -> HttpResponse:
+    sections = _sections()
+    domain = get_current_site(request).domain
+    sitemaps = [
+        SitemapIndexItem(
+            f"{request.scheme}://{domain}"
+            f"{reverse('sitemap_section', args=[section])}",
+            last_mod,
+        )
+        for section, last_mod in sections.items()
+    ]
+    response = HttpResponse(
+        render_to_string('sitemap_index.xml', {'sitemaps': sitemaps}),
+        content_type='application/xml',
+    )
+    return _last_modified(
+        response, max((item.last_mod for item in sitemaps), default=None)
+    )
+
+
+@x_robots_tag
+def sitemap_section(request: HttpRequest, section: int) -> HttpResponse:
+    # Only the sections of the index are cached, not any number asked for
+    if section not in _sections():
+        raise Http404(f"No sitemap section {section}")
+    key = sitemap_section_key(section, request.scheme)
+    cached = cache.get(key)
+    if cached is None:
+        sitemap = PostSitemaps(section)
+        with primary_reads():
+            urls = sitemap.get_urls(
+                site=get_current_site(request), protocol=request.scheme,
+            )
+        cached = (
+            render_to_string('sitemap.xml', {'urlset': urls}),
+            getattr(sitemap, 'latest_lastmod', None),
+        )
+        cache.set(key, cached, settings.BLOG_SITEMAP_CACHE_TIMEOUT)
+
+    content, last_mod = cached
+    return _last_modified(
+        HttpResponse(content, content_type='application/xml'), last_mod,
+    )
@@ -0,0 +1,51 @@
+// Appends the next page of comments of the post, see blog.views.post_comments
+(function () {
+  var button = document.getElementById('load-comments');
+  var container = document.getElementById('comments');
+
+  function paragraphs(text) {
+    var fragment = document.createDocumentFragment();
+    text.split(/\n{2,}/).forEach(function (block) {
+      var paragraph = document.createElement('p');
+      block.split('\n').forEach(function (line, index) {
+        if (index) {
+          paragraph.appendChild(document.createElement('br'));
+        }
+        paragraph.appendChild(document.createTextNode(line));
+      });
+      fragment.appendChild(paragraph);
+    });
+    return fragment;
+  }
+
+  function render(comment) {
+    var number = container.querySelectorAll('.comment').length + 1;
+    var element = document.createElement('div');
+    var info = document.createElement('p');
+    element.className = 'comment';
+    info.className = 'info';
+    info.textContent = 'Comment ' + number + ' by ' + comment.name + ' ' +
+      new Date(comment.created).toLocaleString();
+    element.appendChild(info);
+    element.appendChild(paragraphs(comment.body));
+    container.appendChild(element);
+  }
+
+  button.addEventListener('click', function () {
+    var url = button.dataset.url + '?cursor=' +
+      encodeURIComponent(button.dataset.cursor);
+    button.disabled = true;
+    fetch(url)
+      .then(function (response) { return response.json(); })
+      .then(function (page) {
+        page.comments.forEach(render);
+        if (page.next_cursor) {
+          button.dataset.cursor = page.next_cursor;
+          button.disabled = false;
+        } else {
+          button.remove();
+        }
+      })
+      .catch(function () { button.disabled = false; });
+  });
+})();
@@ -1,26 +1,43 @@
 from django import template
-from django.db.models import Count
+from django.conf import settings
+from ..markup import highlight
 from ..models import Post
 from django.utils.safestring import mark_safe
 import markdown
+from mysite.routers import primary_reads
 
 register = template.Library()
 
+@register.simple_tag
+def sidebar_cache_timeout() -> int:
+    return settings.BLOG_SIDEBAR_CACHE_TIMEOUT
+
+# The sidebar tags fill its cached fragment, so they read the primary
+
 @register.simple_tag
 def total_posts() -> int :
-    return Post.published.count()
+    with primary_reads():
+        return Post.published.count()
 
 @register.inclusion_tag('blog/post/latest_posts.html')
 def show_latest_posts(count=5) -> dict:
-    latest_posts = Post.published.order_by("-publish")[:count]
+    with primary_reads():
+        latest_posts = list(
+            Post.published.without_bodies().order_by("-publish")[:count]
+        )
     return {'latest_posts': latest_posts}
 
 @register.simple_tag
 def get_most_commented_posts(count=5) -> list[ Post ]:
-    return Post.published.annotate(
-        total_comments=Count('comments')
-    ).order_by('-total_comments')[:count]
+    with primary_reads():
+        return list(
+            Post.published.without_bodies().order_by('-comment_count')[:count]
+        )
 
 @register.filter(name='markdown')
 def markdown_format(text) -> str:
-    return mark_safe(markdown.markdown(text))
\ No newline at end of file
+    return mark_safe(markdown.markdown(text))
+
+@register.filter(name='highlight')
+def highlight_headline(headline) -> str:
+    return highlight(headline)
@@ -0,0 +1,145 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from ..models import Post
+
+
+@override_settings(BLOG_API_PAGE_SIZE=2)
+class ApiTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                title=f"Django post {i}",
+                slug=f"django-post-{i}",
+                author=self.user,
+                body=f"Body of Django post {i}",
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.add('django', f'tag-{i}')
+            self.posts.append(post)
+        self.draft = Post.objects.create(
+            title="Django draft",
+            slug="django-draft",
+            author=self.user,
+            body="Draft body",
+        )
+
+    def get(self, url, data=None, status=200):
+        response = self.client.get(url, data)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_post_list(self):
+        """Test that the post list pages through the published posts"""
+        url = reverse('blog:api_post_list')
+        first = self.get(url)
+        self.assertEqual(
+            [post['id'] for post in first['posts']],
+            [self.posts[2].id, self.posts[1].id],
+        )
+        self.assertEqual(first['posts'][0], {
+            'id': self.posts[2].id,
+            'title': 'Django post 2',
+            'url': self.posts[2].get_absolute_url(),
+            'author': 'testuser',
+            'publish': first['posts'][0]['publish'],
+            'excerpt': self.posts[2].excerpt,
+            'tags': ['django', 'tag-2'],
+            'comment_count': 0,
+        })
+        self.assertIsNone(first['previous_cursor'])
+
+        second = self.get(url, {'cursor': first['next_cursor']})
+        self.assertEqual(
+            [post['id'] for post in second['posts']], [self.posts[0].id],
+        )
+        self.assertIsNone(second['next_cursor'])
+        self.get(url, {'cursor': 'invalid'}, status=400)
+
+    def test_sparse_fields(self):
+        """Test that only the columns of the requested fields are loaded"""
+        url = reverse('blog:api_post_list')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(url, {'fields': 'title,title,url'})
+        self.assertEqual(data['posts'][0], {
+            'title': 'Django post 2',
+            'url': self.posts[2].get_absolute_url(),
+        })
+        [query] = queries.captured_queries
+        self.assertNotIn('"body"', query['sql'])
+        self.assertNotIn('"excerpt"', query['sql'])
+
+        data = self.get(url, {'fields': 'id,body'})
+        self.assertEqual(data['posts'][0]['body'], 'Body of Django post 2')
+        error = self.get(url, {'fields': 'title,password'}, status=400)
+        self.assertEqual(error['error'], 'Unknown fields: password')
+
+    def test_post_list_by_tag(self):
+        """Test that the post list filters by tag slug"""
+        url = reverse('blog:api_post_list')
+        data = self.get(url, {'tag': 'tag-1', 'fields': 'id'})
+        self.assertEqual(data['posts'], [{'id': self.posts[1].id}])
+        self.get(url, {'tag': 'missing'}, status=404)
+
+    def test_post_detail(self):
+        """Test that the detail includes the rendered body, not for drafts"""
+        post = self.posts[0]
+        data = self.get(reverse('blog:api_post_detail', args=[post.id]))
+        self.assertEqual(data['body_html'], post.body_html)
+        self.assertNotIn('body', data)
+        self.get(
+            reverse('blog:api_post_detail', args=[self.draft.id]), status=404,
+        )
+
+    def test_tag_list(self):
+        """Test that the tags are listed by name"""
+        url = reverse('blog:api_tag_list')
+        first = self.get(url)
+        self.assertEqual(
+            [tag['slug'] for tag in first['tags']], ['django', 'tag-0'],
+        )
+        second = self.get(url, {'cursor': first['next_cursor']})
+        self.assertEqual(
+            [tag['slug'] for tag in second['tags']], ['tag-1', 'tag-2'],
+        )
+        self.assertEqual(
+            self.get(second['tags'][0]['posts_url'])['posts'][0]['id'],
+            self.posts[1].id,
+        )
+
+    def test_tag_list_published_only(self):
+        """Test that tags only used by drafts are not listed"""
+        self.draft.tags.add('draft-only')
+        slugs = []
+        url = reverse('blog:api_tag_list')
+        cursor = None
+        while True:
+            page = self.get(url, {'cursor': cursor} if cursor else None)
+            slugs += [tag['slug'] for tag in page['tags']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(slugs, ['django', 'tag-0', 'tag-1', 'tag-2'])
+
+    def test_post_search(self):
+        """Test that search results are paged by number"""
+        url = reverse('blog:api_post_search')
+        first = self.get(url, {'query': 'django', 'fields': 'id'})
+        self.assertEqual(len(first['posts']), 2)
+        self.assertEqual(first['next_page'], 2)
+        second = self.get(url, {'query': 'django', 'fields': 'id', 'page': 2})
+        self.assertEqual(len(second['posts']), 1)
+        self.assertIsNone(second['next_page'])
+        found = {post['id'] for post in first['posts'] + second['posts']}
+        self.assertEqual(found, {post.id for post in self.posts})
+
+        self.get(url, {'query': 'django', 'page': 0}, status=400)
+        self.get(url, status=400)
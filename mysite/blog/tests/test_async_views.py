@@ -0,0 +1,125 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from .. import async_views, views
+from ..feeds import LatestPostsFeed
+from ..models import Comment, Post, SimilarPost
+
+
+# Pages are rendered unless a test enables the cache
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = []
+        for i in range(4):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                author=self.user,
+                body=f"Searchable body {i}",
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.add('django')
+            self.posts.append(post)
+        SimilarPost.objects.rebuild()
+
+    def call(self, view, url, *args, **kwargs):
+        request = self.factory.get(url, kwargs.pop('data', None), **kwargs)
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return view(request, *args)
+
+    def test_post_list(self):
+        """Test that the async list shows the page the sync list shows"""
+        url = reverse('blog:post_list')
+        response = self.call(async_views.post_list, url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.posts[-1].title)
+        self.assertEqual(
+            response['ETag'], self.call(views.post_list, url)['ETag'],
+        )
+        revalidated = self.call(
+            async_views.post_list, url, HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_post_list_unknown_tag(self):
+        """Test that an unknown tag is not found"""
+        with self.assertRaises(Http404):
+            self.call(async_views.post_list, '/', 'missing')
+
+    def test_post_detail(self):
+        """Test that the async detail shows the comments and similar posts"""
+        post = self.posts[0]
+        Comment.objects.create(
+            post=post, name='Reader', email='reader@example.com', body='Nice',
+        )
+        args = [post.publish.year, post.publish.month, post.publish.day, post.slug]
+        response = self.call(
+            async_views.post_detail, post.get_absolute_url(), *args,
+        )
+        self.assertContains(response, 'Comment 1 by Reader')
+        self.assertContains(response, self.posts[1].get_absolute_url())
+        self.assertEqual(
+            response['ETag'],
+            self.call(views.post_detail, post.get_absolute_url(), *args)['ETag'],
+        )
+
+        post.status = Post.Status.DRAFT
+        post.save()
+        with self.assertRaises(Http404):
+            self.call(async_views.post_detail, post.get_absolute_url(), *args)
+
+    def test_post_search(self):
+        """Test that the async search counts and pages the results"""
+        response = self.call(
+            async_views.post_search,
+            reverse('blog:post_search'),
+            data={'query': 'searchable'},
+        )
+        self.assertContains(response, 'Found 4 results')
+        for post in self.posts:
+            self.assertContains(response, post.title)
+
+    def test_feeds(self):
+        """Test that the async feeds serve the sync feeds"""
+        url = reverse('blog:post_feed')
+        response = self.call(async_views.post_feed, url)
+        self.assertEqual(
+            response.content, self.call(LatestPostsFeed(), url).content,
+        )
+        self.assertContains(response, self.posts[-1].title)
+
+        url = reverse('blog:post_feed_by_tag', args=['django'])
+        response = self.call(async_views.post_feed_by_tag, url, 'django')
+        self.assertContains(response, self.posts[-1].title)
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=600)
+    def test_page_cache(self):
+        """Test that async pages are cached and purged like sync pages"""
+        url = reverse('blog:post_list')
+        self.call(async_views.post_list, url)
+        with self.assertNumQueries(0):
+            response = self.call(async_views.post_list, url)
+        self.assertContains(response, self.posts[-1].title)
+
+        self.posts[-1].title = 'Renamed post'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[-1].save()
+        self.assertContains(self.call(async_views.post_list, url), 'Renamed post')
+
+    async def test_async_request_metrics(self):
+        """Test that requests served over ASGI are measured"""
+        response = await self.async_client.get(reverse('blog:post_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
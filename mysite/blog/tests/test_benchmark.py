@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_benchmark_report(self):
+        """Test that every route is benchmarked and reported as JSON"""
+        out = StringIO()
+        call_command(
+            'benchmark',
+            '--no-isolate',
+            posts=10,
+            tags=3,
+            comments=20,
+            iterations=2,
+            warmup=0,
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['dataset']['posts'], 10)
+        self.assertEqual(report['routes']['blog:post_list']['status_codes'], [200])
+        self.assertEqual(report['routes']['sitemap']['status_codes'], [200])
+        for stats in report['routes'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+            self.assertGreater(stats['queries'], 0)
+
+    def test_benchmark_leaves_cache_alone(self):
+        """Test that the benchmark runs with a cache of its own"""
+        cache.set('benchmark-test', 'kept')
+        call_command(
+            'benchmark',
+            '--no-isolate',
+            posts=2,
+            tags=1,
+            comments=2,
+            iterations=2,
+            warmup=0,
+            stdout=StringIO(),
+        )
+        self.assertEqual(cache.get('benchmark-test'), 'kept')
@@ -0,0 +1,73 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from ..models import Comment, Post
+
+
+class CommentCountTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Counted Post",
+            slug="counted-post",
+            author=self.user,
+            body="Counted post content",
+            status=Post.Status.PUBLISHED,
+        )
+
+    def add_comment(self, activate=True) -> Comment:
+        return Comment.objects.create(
+            post=self.post,
+            name="Commenter",
+            email="commenter@example.com",
+            body="Nice post!",
+            activate=activate,
+        )
+
+    def assertCommentCount(self, expected):
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, expected)
+
+    def test_count_on_create_and_delete(self):
+        """Test that only active comments are counted"""
+        comment = self.add_comment()
+        self.add_comment(activate=False)
+        self.assertCommentCount(1)
+
+        comment.delete()
+        self.assertCommentCount(0)
+
+    def test_count_on_toggle(self):
+        """Test that toggling activate updates the counter"""
+        comment = Comment.objects.get(id=self.add_comment().id)
+        comment.activate = False
+        comment.save()
+        self.assertCommentCount(0)
+
+        comment.activate = True
+        comment.save()
+        self.assertCommentCount(1)
+
+    def test_count_on_bulk_toggle(self):
+        """Test that bulk (de)activation updates the counter"""
+        self.add_comment()
+        self.add_comment(activate=False)
+        self.add_comment(activate=False)
+
+        Comment.objects.all().set_active(True)
+        self.assertCommentCount(3)
+        Comment.objects.all().set_active(False)
+        self.assertCommentCount(0)
+
+    def test_reconcile_command(self):
+        """Test that the command repairs a drifted counter"""
+        self.add_comment()
+        Post.objects.filter(id=self.post.id).update(comment_count=7)
+
+        call_command('reconcile_comment_counts', stdout=StringIO())
+        self.assertCommentCount(1)
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ..models import Comment, Post
+
+
+# Validators are tested without the page cache answering first
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = []
+        for i in range(4):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                author=self.user,
+                body=f"Body {i}",
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.add('django')
+            self.posts.append(post)
+
+    def assertNotModified(self, url, queries=1, by_date=True):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(queries):
+            revalidated = self.client.get(
+                url, headers={'If-None-Match': response['ETag']},
+            )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+        if not by_date:
+            # Lists lose posts without getting newer, so they have no date
+            self.assertFalse(response.has_header('Last-Modified'))
+            return response['ETag']
+        revalidated = self.client.get(
+            url, headers={'If-Modified-Since': response['Last-Modified']},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        return response['ETag']
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def assertModifiedSince(self, url, last_modified):
+        response = self.client.get(
+            url, headers={'If-Modified-Since': last_modified},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def age(self, post):
+        """Move the last update of the post a minute back"""
+        post.updated -= timedelta(minutes=1)
+        Post.objects.filter(pk=post.pk).update(updated=post.updated)
+
+    def test_post_detail(self):
+        """Test that the detail page changes with the post and comments"""
+        url = self.posts[0].get_absolute_url()
+        etag = self.assertNotModified(url)
+
+        comment = Comment.objects.create(
+            post=self.posts[0],
+            name='Reader',
+            email='reader@example.com',
+            body='Nice',
+        )
+        self.assertModified(url, etag)
+        etag = self.assertNotModified(url)
+
+        Comment.objects.filter(pk=comment.pk).set_active(False)
+        self.assertModified(url, etag)
+
+    def test_post_detail_modified_since(self):
+        """Test that the detail page gets newer when comments go away"""
+        post = self.posts[0]
+        url = post.get_absolute_url()
+        comments = [
+            Comment.objects.create(
+                post=post, name='Reader', email='reader@example.com', body=body,
+            )
+            for body in ('Nice', 'Great')
+        ]
+        self.age(post)
+        last_modified = self.client.get(url)['Last-Modified']
+        Comment.objects.filter(pk=comments[0].pk).set_active(False)
+        self.assertModifiedSince(url, last_modified)
+
+        self.age(post)
+        last_modified = self.client.get(url)['Last-Modified']
+        comments[1].delete()
+        self.assertModifiedSince(url, last_modified)
+
+    def test_post_detail_varies_on_cookie(self):
+        """Test that browsers revalidate per CSRF cookie, for the form token"""
+        response = self.client.get(self.posts[0].get_absolute_url())
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_post_list(self):
+        """Test that the list changes when a post of the page changes"""
+        url = reverse('blog:post_list')
+        etag = self.assertNotModified(url, by_date=False)
+
+        self.posts[-1].title = 'Renamed'
+        self.posts[-1].save()
+        self.assertModified(url, etag)
+
+    def test_post_list_by_tag(self):
+        """Test that the tag list changes when a post is tagged"""
+        url = reverse('blog:post_list_by_tag', args=['python'])
+        self.posts[0].tags.add('python')
+        etag = self.assertNotModified(url, by_date=False)
+
+        self.posts[1].tags.add('python')
+        self.assertModified(url, etag)
+
+    def test_feed(self):
+        """Test that the feed changes when a post is unpublished"""
+        url = reverse('blog:post_feed')
+        etag = self.assertNotModified(url, by_date=False)
+
+        self.posts[1].status = Post.Status.DRAFT
+        self.posts[1].save()
+        self.assertModified(url, etag)
+
+    def test_post_list_unpublished(self):
+        """Test that the list changes when a post of the page is unpublished"""
+        url = reverse('blog:post_list')
+        etag = self.assertNotModified(url, by_date=False)
+
+        self.posts[-1].status = Post.Status.DRAFT
+        self.posts[-1].save()
+        self.assertModified(url, etag)
+        # Not answered from an older date either
+        self.assertModifiedSince(url, 'Mon, 01 Jan 2024 00:00:00 GMT')
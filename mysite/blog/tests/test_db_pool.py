@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from mysite.metrics import registry
+
+
+# Outside of a test transaction, so that connections can be returned
+class ConnectionPoolTest(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.pool = connection.pool
+        if self.pool is None:
+            self.skipTest('DB_POOL is disabled')
+        self.pool.wait()
+
+    def query(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_connections_reused(self):
+        """Test that closed connections go back to the pool"""
+        self.query()
+        connection.close()
+        stats = self.pool.get_stats()
+        for _ in range(5):
+            self.query()
+            connection.close()
+        after = self.pool.get_stats()
+        self.assertEqual(after['requests_num'], stats['requests_num'] + 5)
+        self.assertEqual(
+            after.get('connections_num'), stats.get('connections_num'),
+        )
+
+    def test_broken_connection_discarded(self):
+        """Test that a connection closed under Django is not lent again"""
+        self.query()
+        raw = connection.connection
+        raw.close()
+        with self.assertLogs('psycopg.pool', 'WARNING'):
+            connection.close()
+        self.query()
+        self.assertIsNot(connection.connection, raw)
+        connection.close()
+
+    def test_pool_metrics(self):
+        """Test that the pool statistics are exposed with the metrics"""
+        self.query()
+        in_use = registry.render()
+        connection.close()
+        self.assertRegex(
+            in_use, r'mysite_db_pool_connections_in_use\{alias="default"\} [1-9]',
+        )
+        self.assertRegex(
+            registry.render(),
+            r'mysite_db_pool_requests_total\{alias="default"\} [1-9]',
+        )
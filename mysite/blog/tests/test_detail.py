@@ -1,12 +1,14 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
 from taggit.models import Tag
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
 from ..models import Post, Comment
 from ..forms import CommentForm
 
+# The context is only set when the page is rendered
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
 class PostDetailViewTest(TestCase):
     def setUp(self):
         # Create a test user
@@ -165,4 +167,64 @@ class PostDetailViewTest(TestCase):
         """Test accessing post with incorrect date"""
         url = reverse('blog:post_detail', args=[2023, 12, 31, self.post.slug])  # Wrong date
         response = self.client.get(url)
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(BLOG_COMMENTS_PER_PAGE=2)
+    def test_comments_paginated(self):
+        """Test that comments are shown a page at a time, oldest first"""
+        comments = [self.active_comment] + [
+            Comment.objects.create(
+                post=self.post,
+                name=f"Reader {i}",
+                email="reader@example.com",
+                body=f"Comment {i}",
+            )
+            for i in range(4)
+        ]
+        response = self.client.get(self.post.get_absolute_url())
+        page = response.context['comments']
+        self.assertEqual(list(page), comments[:2])
+        self.assertContains(response, 'Load more comments')
+
+        loaded = []
+        cursor = page.next_cursor
+        while cursor:
+            response = self.client.get(
+                reverse('blog:post_comments', args=[self.post.id]),
+                {'cursor': cursor},
+            )
+            data = response.json()
+            loaded.extend(comment['id'] for comment in data['comments'])
+            cursor = data['next_cursor']
+        self.assertEqual(loaded, [comment.id for comment in comments[2:]])
+
+    def test_comments_endpoint_errors(self):
+        """Test that bad cursors and unpublished posts are rejected"""
+        url = reverse('blog:post_comments', args=[self.post.id])
+        self.assertEqual(self.client.get(url, {'cursor': 'bad'}).status_code, 400)
+        self.post.status = Post.Status.DRAFT
+        self.post.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_day_of_time_zone(self):
+        """Test that the URL and the lookup use the day of TIME_ZONE"""
+        self.post.publish = timezone.make_aware(datetime(2024, 1, 1, 3), dt_timezone.utc)
+        self.post.save()
+        url = self.post.get_absolute_url()
+        self.assertEqual(
+            url, reverse('blog:post_detail', args=[2023, 12, 31, 'test-post'])
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+        utc_url = reverse('blog:post_detail', args=[2024, 1, 1, 'test-post'])
+        self.assertEqual(self.client.get(utc_url).status_code, 404)
+
+    def test_nonexistent_day(self):
+        """Test that a day that does not exist is not found"""
+        url = reverse('blog:post_detail', args=[2024, 2, 30, self.post.slug])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_last_representable_day(self):
+        """Test that a day with no next day to end its range is not found"""
+        url = reverse('blog:post_detail', args=[9999, 12, 31, self.post.slug])
+        self.assertEqual(self.client.get(url).status_code, 404)
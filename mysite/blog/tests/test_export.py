@@ -0,0 +1,167 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+from ..models import Comment, Post
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                author=self.user,
+                body=f"Body of post {i}",
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.add('django', f'tag-{i}')
+            Comment.objects.create(
+                post=post,
+                name='Reader',
+                email='reader@example.com',
+                body=f"Comment on post {i}",
+            )
+            self.posts.append(post)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.directory = Path(directory)
+
+    def export(self, name, **options):
+        path = self.directory / name
+        call_command(
+            'export_blog', output=str(path), chunk_size=2, stdout=StringIO(),
+            **options,
+        )
+        return path
+
+    def read(self, path):
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8') as lines:
+            return [json.loads(line) for line in lines]
+
+    def test_export(self):
+        """Test that every object is exported once, in loading order"""
+        objects = self.read(self.export('blog.jsonl'))
+        self.assertEqual(
+            [obj['model'] for obj in objects],
+            ['taggit.tag'] * 4 + ['blog.post'] * 3
+            + ['taggit.taggeditem'] * 6 + ['blog.comment'] * 3,
+        )
+        post = objects[4]
+        self.assertEqual(post['pk'], self.posts[0].id)
+        self.assertEqual(post['fields']['body'], 'Body of post 0')
+        self.assertNotIn('search_vector', post['fields'])
+
+    def test_incremental_export(self):
+        """Test that only the posts and comments updated since are exported"""
+        last_week = timezone.now() - timedelta(days=7)
+        Post.objects.exclude(id=self.posts[1].id).update(updated=last_week)
+        Comment.objects.exclude(post=self.posts[2]).update(updated=last_week)
+
+        objects = self.read(self.export(
+            'blog.jsonl.gz', since=timezone.now() - timedelta(days=1),
+        ))
+        exported = {(obj['model'], obj['pk']) for obj in objects}
+        self.assertEqual(exported, {
+            *(('taggit.tag', tag.id) for tag in self.posts[1].tags.all()),
+            ('blog.post', self.posts[1].id),
+            *(
+                ('taggit.taggeditem', item.id)
+                for item in TaggedItem.objects.filter(object_id=self.posts[1].id)
+            ),
+            ('blog.comment', self.posts[2].comments.get().id),
+        })
+
+    def test_incremental_export_of_changes(self):
+        """Test that moderated comments and retagged posts are exported"""
+        last_week = timezone.now() - timedelta(days=7)
+        Post.objects.update(updated=last_week)
+        Comment.objects.update(updated=last_week)
+        comment = self.posts[0].comments.get()
+        Comment.objects.filter(pk=comment.pk).set_active(False)
+        self.posts[1].tags.add('python')
+
+        objects = self.read(self.export(
+            'blog.jsonl', since=timezone.now() - timedelta(days=1),
+        ))
+        exported = {
+            (obj['model'], obj['pk']): obj['fields'] for obj in objects
+        }
+        self.assertFalse(exported['blog.comment', comment.id]['activate'])
+        self.assertIn(('blog.post', self.posts[0].id), exported)
+        self.assertIn(('blog.post', self.posts[1].id), exported)
+        self.assertIn(
+            ('taggit.tag', Tag.objects.get(name='python').id), exported,
+        )
+        self.assertNotIn(('blog.post', self.posts[2].id), exported)
+
+    def test_loaddata(self):
+        """Test that a compressed export loads back with loaddata"""
+        path = self.export('blog.jsonl', gzip=True)
+        self.assertEqual(path.read_bytes()[:2], b'\x1f\x8b')
+        path = path.rename(path.with_suffix('.jsonl.gz'))
+        Post.objects.all().delete()
+        Tag.objects.all().delete()
+
+        call_command('loaddata', str(path), verbosity=0)
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(
+            set(self.posts[0].tags.names()), {'django', 'tag-0'},
+        )
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertTrue(Post.objects.filter(search_vector='body').exists())
+
+
+class ExportSnapshotTest(TransactionTestCase):
+    """
+        Exports outside of a transaction, which read a single snapshot
+    """
+
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Test Post",
+            slug="test-post",
+            author=self.user,
+            body="Test post content",
+            status=Post.Status.PUBLISHED,
+        )
+        self.post.tags.add('django')
+
+    def test_export_to_stdout(self):
+        """Test that the export reads a snapshot and streams to stdout"""
+        stdout, stderr = StringIO(), StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command('export_blog', stdout=stdout, stderr=stderr)
+        # Only effective as the first statement of the transaction
+        self.assertEqual(
+            [query['sql'] for query in context.captured_queries[:2]],
+            ['BEGIN', 'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'],
+        )
+        objects = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(
+            [obj['model'] for obj in objects],
+            ['taggit.tag', 'blog.post', 'taggit.taggeditem'],
+        )
+        self.assertIn('Exported 1 taggit.Tag', stderr.getvalue())
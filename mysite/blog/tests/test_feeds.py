@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ..models import Post
+
+
+class FeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.django_post = self.create_post('django-post', 'django')
+        self.python_post = self.create_post('python-post', 'python')
+
+    def create_post(self, slug, *tags, status=Post.Status.PUBLISHED) -> Post:
+        post = Post.objects.create(
+            title=slug.title(),
+            slug=slug,
+            author=self.user,
+            body=f"First paragraph of **{slug}**.\n\n" + "word " * 100,
+            status=status,
+        )
+        post.tags.add(*tags)
+        return post
+
+    def test_descriptions_from_excerpts(self):
+        """Test that item descriptions are the stored excerpts"""
+        response = self.client.get(reverse('blog:post_feed'))
+        self.assertContains(
+            response, 'First paragraph of &lt;strong&gt;django-post&lt;/strong&gt;'
+        )
+        self.assertNotContains(response, 'word ' * 40)
+
+    def test_feed_cached_until_post_changes(self):
+        """Test that the feed is rendered once per version of the posts"""
+        url = reverse('blog:post_feed')
+        self.client.get(url)
+        # Only the conditional GET validator
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.create_post('draft-post', 'django', status=Post.Status.DRAFT)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.python_post.title = 'Renamed python post'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_post.save()
+            # Until committed, a render would cache the old post again
+            with self.assertNumQueries(1):
+                self.client.get(url)
+        self.assertContains(self.client.get(url), 'Renamed python post')
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_feed_cache_timeout(self):
+        """Test that cached feeds expire after BLOG_PAGE_CACHE_TIMEOUT"""
+        url = reverse('blog:post_feed')
+        self.client.get(url)
+        # Validator and posts, the current site is cached by the framework
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_tag_feed(self):
+        """Test that a tag feed only lists the posts with the tag"""
+        url = reverse('blog:post_feed_by_tag', args=['django'])
+        response = self.client.get(url)
+        self.assertContains(response, 'Django-Post')
+        self.assertNotContains(response, 'Python-Post')
+        self.assertContains(response, reverse('blog:post_list_by_tag', args=['django']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_post.tags.add('django')
+        self.assertContains(self.client.get(url), 'Python-Post')
+
+    def test_unknown_tag_feed(self):
+        """Test that the feed of an unknown tag is not found"""
+        response = self.client.get(
+            reverse('blog:post_feed_by_tag', args=['unknown'])
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+from taggit.models import TaggedItem
+from ..models import Comment, Post, SimilarPost
+
+
+class OfflineGeneratePostTest(TestCase):
+    def generate(self, method):
+        call_command(
+            'generate_post',
+            '--offline',
+            posts=25,
+            tags=5,
+            comments=60,
+            batch_size=10,
+            method=method,
+            similar=True,
+            stdout=StringIO(),
+        )
+
+    def assertDatasetConsistent(self):
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertEqual(Comment.objects.count(), 60)
+        self.assertTrue(TaggedItem.objects.exists())
+        self.assertTrue(SimilarPost.objects.exists())
+        # Counters match the generated active comments
+        self.assertEqual(
+            Post.objects.aggregate(total=Sum('comment_count'))['total'],
+            Comment.objects.filter(activate=True).count(),
+        )
+        post = Post.objects.exclude(body_html='').first()
+        self.assertIn('<h2>', post.body_html)
+
+    def test_bulk_create(self):
+        """Test generating a dataset with bulk_create"""
+        self.generate('bulk')
+        self.assertDatasetConsistent()
+
+    def test_copy(self):
+        """Test generating a dataset with COPY"""
+        self.generate('copy')
+        self.assertDatasetConsistent()
+        # Rows created afterwards do not collide with the copied ids
+        post = Post.objects.first()
+        post.pk = None
+        post.save()
+        self.assertEqual(Post.objects.count(), 26)
+
+    def test_generate_again(self):
+        """Test that a second dataset gets new slugs"""
+        self.generate('copy')
+        self.generate('bulk')
+        self.assertEqual(len(set(Post.objects.values_list('slug', flat=True))), 50)
+        self.assertEqual(
+            Post.objects.aggregate(total=Sum('comment_count'))['total'],
+            Comment.objects.filter(activate=True).count(),
+        )
+
+    def test_comments_drawn_from_all_posts(self):
+        """Test that the first comments are not limited to the first posts"""
+        self.generate('bulk')
+        first_batch = Post.objects.order_by('id').values('id')[:10]
+        first_comments = Comment.objects.order_by('id')[:10]
+        self.assertTrue(
+            Post.objects.exclude(id__in=first_batch)
+            .filter(comments__in=first_comments)
+            .exists()
+        )
+
+
+class StubCompletions(BaseHTTPRequestHandler):
+    """
+        Chat completions answering each prompt after a short delay
+    """
+
+    def do_POST(self):
+        server = self.server
+        prompt = json.loads(
+            self.rfile.read(int(self.headers['Content-Length']))
+        )['messages'][0]['content']
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = server.failures > 0
+            server.failures -= fail
+            number = server.requests
+        time.sleep(0.05)
+        with server.lock:
+            server.in_flight -= 1
+
+        if fail:
+            self.send_response(503)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{"error": {"message": "overloaded"}}')
+            return
+        if prompt.startswith('Generate'):
+            content = f'Stub title {number}'
+        elif prompt.startswith('Write'):
+            content = f'# Stub\n\nBody for {prompt}'
+        else:
+            content = '#python, django ,#python'
+        body = json.dumps({
+            'id': f'stub-{number}',
+            'object': 'chat.completion',
+            'created': 0,
+            'model': 'stub',
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GeneratePostTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubCompletions)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.failures = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def generate(self, **options):
+        out = StringIO()
+        call_command(
+            'generate_post',
+            base_url=f'http://127.0.0.1:{self.server.server_port}/v1',
+            stdout=out,
+            stderr=StringIO(),
+            **options,
+        )
+        return out.getvalue()
+
+    def test_single_draft(self):
+        """Test generating one draft with its tags"""
+        out = self.generate()
+        post = Post.objects.get()
+        self.assertIn(f'New draft blog post created: {post.title}', out)
+        self.assertEqual(post.status, Post.Status.DRAFT)
+        self.assertEqual(post.author, self.user)
+        self.assertIn('<h1>Stub</h1>', post.body_html)
+        self.assertEqual(
+            sorted(post.tags.values_list('name', flat=True)),
+            ['django', 'python'],
+        )
+        self.assertEqual(self.server.requests, 3)
+
+    def test_concurrent_batch(self):
+        """Test generating several drafts concurrently in batches"""
+        out = self.generate(count=6, concurrency=3, batch_size=4)
+        self.assertIn('6 drafts created, 0 failed.', out)
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(TaggedItem.objects.count(), 12)
+        # Each body was requested for the title of its own draft
+        for post in Post.objects.all():
+            self.assertIn(post.title, post.body)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_retries_failed_requests(self):
+        """Test that failed requests are retried"""
+        self.server.failures = 1
+        self.generate(retries=1)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(self.server.requests, 4)
+
+    def test_failed_drafts_reported(self):
+        """Test that drafts failing after the retries are skipped"""
+        self.server.failures = 1
+        with self.assertRaises(CommandError):
+            self.generate(retries=0)
+        self.assertFalse(Post.objects.exists())
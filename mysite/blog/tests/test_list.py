@@ -1,10 +1,12 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from taggit.models import Tag
 from ..models import Post
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 
+# Render every request, the tests inspect the context
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
 class PostListViewTest(TestCase):
     def setUp(self):
         # Create a test user
@@ -78,4 +80,46 @@ class PostListViewTest(TestCase):
     def test_post_list_invalid_tag(self):
         # Test the post list view with an invalid tag
         response = self.client.get(reverse('blog:post_list_by_tag', args=['nonexistent']))
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_list_cursor_pagination(self):
+        # Test walking the post list forwards and backwards with cursors
+        for i in range(4, 8):
+            Post.objects.create(
+                title=f"Post {i}",
+                body=f"Body for post {i}",
+                status='PB',
+                author=self.user,
+                slug=slugify(f"Post {i}")
+            )
+        url = reverse('blog:post_list')
+
+        first = self.client.get(url).context['posts']
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.client.get(url, {'cursor': first.next_cursor}).context['posts']
+        third = self.client.get(url, {'cursor': second.next_cursor}).context['posts']
+        self.assertEqual(len(third), 1)
+        self.assertFalse(third.has_next())
+
+        # Every post is listed exactly once, newest first
+        listed = [*first, *second, *third]
+        self.assertEqual(listed, list(Post.published.order_by('-publish', '-id')))
+
+        previous = self.client.get(url, {'cursor': third.previous_cursor}).context['posts']
+        self.assertEqual(list(previous), list(second))
+        self.assertTrue(previous.has_previous())
+
+    def test_post_list_by_tag_cursor_pagination(self):
+        # Test that the tag listing is paginated with cursors too
+        url = reverse('blog:post_list_by_tag', args=['python'])
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertFalse(response.context['posts'].has_next())
+
+    def test_post_list_invalid_cursor(self):
+        # Test the post list view with a malformed cursor
+        response = self.client.get(reverse('blog:post_list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['posts']), 3)
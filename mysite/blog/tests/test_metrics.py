@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from mysite.metrics import registry
+from ..models import Post
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        registry.reset()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Timed Post",
+            slug="timed-post",
+            author=self.user,
+            body="Timed post content",
+            status=Post.Status.PUBLISHED,
+        )
+
+    def test_server_timing_header(self):
+        """Test that the timings are sent in a Server-Timing header"""
+        response = self.client.get(reverse('blog:post_list'))
+        server_timing = response['Server-Timing']
+
+        self.assertRegex(server_timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(server_timing, r'render;dur=[\d.]+')
+        self.assertRegex(server_timing, r'total;dur=[\d.]+')
+
+    def test_metrics_endpoint(self):
+        """Test that the histograms are exposed per URL name"""
+        self.client.get(reverse('blog:post_list'))
+        self.client.get(reverse('blog:post_list'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response,
+            'mysite_request_duration_seconds_count{view="blog:post_list"} 2'
+        )
+        self.assertContains(
+            response,
+            'mysite_request_db_queries_bucket{view="blog:post_list",le="+Inf"} 2'
+        )
+
+    def test_metrics_endpoint_restricted(self):
+        """Test that only internal addresses can read the metrics"""
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
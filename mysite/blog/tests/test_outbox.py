@@ -0,0 +1,232 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from ..models import OutgoingEmail, Post
+
+
+class CountingBackend(EmailBackend):
+    """
+        locmem backend counting the connections opened
+    """
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+    """
+        locmem backend rejecting the messages to fail@example.com
+    """
+
+    def send_messages(self, messages):
+        for message in messages:
+            if 'fail@example.com' in message.to:
+                raise ConnectionError('rejected')
+        return super().send_messages(messages)
+
+
+class FailingCloseBackend(FailingBackend):
+    """
+        FailingBackend whose connection fails to close
+    """
+
+    def close(self):
+        raise ConnectionError('closing failed')
+
+
+class InspectingBackend(EmailBackend):
+    """
+        locmem backend recording the transaction and the email statuses
+        seen while sending
+    """
+    seen = []
+
+    def send_messages(self, messages):
+        InspectingBackend.seen.append((
+            connection.in_atomic_block,
+            list(OutgoingEmail.objects.values_list('status', flat=True)),
+        ))
+        return super().send_messages(messages)
+
+
+class ReclaimingBackend(EmailBackend):
+    """
+        locmem backend during whose sending the claims expire and another
+        worker claims the emails again
+    """
+
+    def send_messages(self, messages):
+        OutgoingEmail.objects.update(
+            next_attempt=timezone.now() + timedelta(minutes=5)
+        )
+        return super().send_messages(messages)
+
+
+@override_settings(BLOG_OUTBOX_MAX_ATTEMPTS=2, BLOG_OUTBOX_RETRY_DELAY=60)
+class OutboxTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Test Post",
+            slug="test-post",
+            author=self.user,
+            body="Test post content",
+            status=Post.Status.PUBLISHED,
+        )
+
+    def queue(self, to, count=1):
+        return OutgoingEmail.objects.bulk_create(
+            OutgoingEmail(subject=f'Email {i}', body='Body', to=to)
+            for i in range(count)
+        )
+
+    def send_outbox(self, **options):
+        call_command('send_outbox', stdout=StringIO(), **options)
+
+    def test_share_queues_email(self):
+        """Test that sharing a post queues the email instead of sending it"""
+        response = self.client.post(
+            reverse('blog:post_share', args=[self.post.id]),
+            {
+                'name': 'Reader',
+                'email': 'reader@example.com',
+                'to': 'friend@example.com',
+                'comments': 'Worth it',
+            },
+        )
+        self.assertTrue(response.context['sent'])
+        self.assertEqual(mail.outbox, [])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, 'friend@example.com')
+        self.assertEqual(email.status, OutgoingEmail.Status.PENDING)
+        self.assertIn(self.post.get_absolute_url(), email.body)
+        self.assertIn("Reader's comments: Worth it", email.body)
+
+    def test_share_long_subject(self):
+        """Test that sharing a post with a long title and address is queued"""
+        self.post.title = 'T' * 250
+        self.post.save()
+        response = self.client.post(
+            reverse('blog:post_share', args=[self.post.id]),
+            {
+                'name': 'N' * 25,
+                'email': f"{'e' * 64}@{'d' * 63}.{'x' * 63}.com",
+                'to': 'friend@example.com',
+                'comments': '',
+            },
+        )
+        self.assertTrue(response.context['sent'])
+        self.assertIn(self.post.title, OutgoingEmail.objects.get().subject)
+
+    @override_settings(EMAIL_BACKEND='blog.tests.test_outbox.CountingBackend')
+    def test_batches_share_a_connection(self):
+        """Test that each batch is sent over a single connection"""
+        CountingBackend.opened = 0
+        self.queue('friend@example.com', count=5)
+        self.send_outbox(batch_size=3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertFalse(
+            OutgoingEmail.objects.exclude(status=OutgoingEmail.Status.SENT).exists()
+        )
+        self.assertFalse(OutgoingEmail.objects.filter(sent=None).exists())
+
+    @override_settings(EMAIL_BACKEND='blog.tests.test_outbox.FailingBackend')
+    def test_failures_retried_then_dead(self):
+        """Test that failed emails are retried later, then marked dead"""
+        [failing] = self.queue('fail@example.com')
+        self.queue('friend@example.com')
+        self.send_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutgoingEmail.Status.PENDING)
+        self.assertEqual(failing.attempts, 1)
+        self.assertEqual(failing.last_error, 'ConnectionError: rejected')
+        self.assertGreater(
+            failing.next_attempt, timezone.now() + timedelta(seconds=50)
+        )
+
+        # Not due yet
+        self.send_outbox()
+        failing.refresh_from_db()
+        self.assertEqual(failing.attempts, 1)
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        self.send_outbox()
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutgoingEmail.Status.DEAD)
+        self.assertEqual(failing.attempts, 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='blog.tests.test_outbox.FailingCloseBackend')
+    def test_connection_failure_counted_once(self):
+        """Test that an email failing before the connection does counts once"""
+        [failing] = self.queue('fail@example.com')
+        [delivered] = self.queue('friend@example.com')
+        self.send_outbox()
+        failing.refresh_from_db()
+        self.assertEqual(failing.attempts, 1)
+        self.assertEqual(failing.last_error, 'ConnectionError: rejected')
+        delivered.refresh_from_db()
+        self.assertEqual(delivered.status, OutgoingEmail.Status.SENT)
+
+    def test_expired_claim_sent_again(self):
+        """Test that the emails of a worker past its claim are sent again"""
+        [expired] = self.queue('friend@example.com')
+        [claimed] = self.queue('other@example.com')
+        OutgoingEmail.objects.filter(id=expired.id).update(
+            status=OutgoingEmail.Status.SENDING,
+            next_attempt=timezone.now() - timedelta(seconds=1),
+        )
+        OutgoingEmail.objects.filter(id=claimed.id).update(
+            status=OutgoingEmail.Status.SENDING,
+            next_attempt=timezone.now() + timedelta(minutes=5),
+        )
+        self.send_outbox()
+        self.assertEqual(
+            [message.to for message in mail.outbox], [['friend@example.com']]
+        )
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, OutgoingEmail.Status.SENT)
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, OutgoingEmail.Status.SENDING)
+
+    @override_settings(EMAIL_BACKEND='blog.tests.test_outbox.ReclaimingBackend')
+    def test_lost_claim_left_to_new_worker(self):
+        """Test that the outcome of an email claimed again is not saved"""
+        [email] = self.queue('friend@example.com')
+        self.send_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.Status.SENDING)
+        self.assertEqual(email.attempts, 0)
+
+
+class OutboxTransactionTest(TransactionTestCase):
+    @override_settings(EMAIL_BACKEND='blog.tests.test_outbox.InspectingBackend')
+    def test_sent_outside_transactions(self):
+        """Test that the emails are claimed, then sent with no transaction"""
+        InspectingBackend.seen = []
+        OutgoingEmail.objects.create(
+            subject='Email', body='Body', to='friend@example.com'
+        )
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(
+            InspectingBackend.seen, [(False, [OutgoingEmail.Status.SENDING])]
+        )
+        self.assertEqual(
+            OutgoingEmail.objects.get().status, OutgoingEmail.Status.SENT
+        )
@@ -0,0 +1,209 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+from ..models import Comment, Post
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = [self.create_post(i, 'django') for i in range(5)]
+        # Not similar to the others, so its page does not show them
+        self.other = self.create_post('other')
+
+    def create_post(self, i, *tags) -> Post:
+        post = Post.objects.create(
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            author=self.user,
+            body=f"Body {i}",
+            status=Post.Status.PUBLISHED,
+        )
+        post.tags.add(*tags)
+        return post
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertRendered(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context)
+        return response
+
+    def warm(self, *urls):
+        for url in urls:
+            self.client.get(url)
+
+    def test_pages_cached(self):
+        """Test that anonymous reads are served from the cache"""
+        urls = [
+            reverse('blog:post_list'),
+            reverse('blog:post_list_by_tag', args=['django']),
+            self.posts[0].get_absolute_url(),
+        ]
+        self.warm(*urls)
+        for url in urls:
+            self.assertCached(url)
+
+    def test_revalidated_from_cache(self):
+        """Test that cached pages answer conditional GETs"""
+        url = self.posts[0].get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_sessions_not_cached(self):
+        """Test that readers with a session get rendered pages"""
+        url = reverse('blog:post_list')
+        self.warm(url)
+        self.client.force_login(self.user)
+        self.assertRendered(url)
+
+    def test_post_save_purges_its_pages(self):
+        """Test that saving a post purges exactly the pages showing it"""
+        newest = self.posts[-1]
+        list_url = reverse('blog:post_list')
+        self.warm(list_url, newest.get_absolute_url(), self.other.get_absolute_url())
+
+        newest.title = 'Renamed post'
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.save()
+        self.assertContains(self.assertRendered(list_url), 'Renamed post')
+        self.assertContains(
+            self.assertRendered(newest.get_absolute_url()), 'Renamed post'
+        )
+        self.assertCached(self.other.get_absolute_url())
+
+    def test_new_post_purges_lists(self):
+        """Test that publishing a post purges the lists"""
+        list_url = reverse('blog:post_list')
+        self.warm(list_url, self.other.get_absolute_url())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_post(5)
+        self.assertContains(self.assertRendered(list_url), 'Post 5')
+        self.assertCached(self.other.get_absolute_url())
+
+    def test_comment_moderation_purges_post(self):
+        """Test that moderating a comment purges the page of its post"""
+        post = self.posts[0]
+        comment = Comment.objects.create(
+            post=post,
+            name='Reader',
+            email='reader@example.com',
+            body='Spam comment',
+        )
+        self.warm(post.get_absolute_url(), self.other.get_absolute_url())
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.filter(pk=comment.pk).set_active(False)
+        self.assertNotContains(
+            self.assertRendered(post.get_absolute_url()), 'Spam comment'
+        )
+        self.assertCached(self.other.get_absolute_url())
+
+    def test_tag_change_purges_tag_pages(self):
+        """Test that tagging a post purges the pages of the tag"""
+        python_url = reverse('blog:post_list_by_tag', args=['python'])
+        django_url = reverse('blog:post_list_by_tag', args=['django'])
+        self.posts[0].tags.add('python')
+        self.warm(python_url, django_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[1].tags.add('python')
+        self.assertContains(self.assertRendered(python_url), 'Post 1')
+        # Post 1 is not on the first page of the django tag
+        self.assertCached(django_url)
+
+    def test_purged_once_committed(self):
+        """Test that the pages are purged only once the changes are committed"""
+        post = self.posts[-1]
+        list_url = reverse('blog:post_list')
+        self.warm(list_url, post.get_absolute_url())
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                post.title = 'Renamed post'
+                post.save()
+                post.tags.add('python')
+                Comment.objects.create(
+                    post=post,
+                    name='Reader',
+                    email='reader@example.com',
+                    body='New comment',
+                )
+            # A render before the commit would cache the old post again
+            self.assertCached(list_url)
+            self.assertCached(post.get_absolute_url())
+        self.assertContains(self.assertRendered(list_url), 'Renamed post')
+        self.assertContains(
+            self.assertRendered(post.get_absolute_url()), 'New comment'
+        )
+
+    def test_unread_parameters_ignored(self):
+        """Test that query parameters the views do not read share the page"""
+        url = reverse('blog:post_list')
+        self.warm(url, f'{url}?cursor=invalid')
+        self.assertCached(f'{url}?utm_source=feed')
+        self.assertCached(f'{url}?cursor=invalid&utm_source=feed')
+
+    def test_similar_posts_purge_pages(self):
+        """Test that changes of the similar posts purge the pages listing them"""
+        post = self.posts[0]
+        self.warm(post.get_absolute_url())
+        # Post other becomes the most similar post of the others
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.tags.add('django')
+        response = self.assertRendered(post.get_absolute_url())
+        self.assertIn(self.other, response.context['similar_posts'])
+
+        self.warm(post.get_absolute_url())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.tags.clear()
+        response = self.assertRendered(post.get_absolute_url())
+        self.assertNotIn(self.other, response.context['similar_posts'])
+
+    def test_reconcile_purges_pages(self):
+        """Test that repaired comment counts purge the pages of their posts"""
+        post = self.posts[0]
+        Post.objects.filter(pk=post.pk).update(comment_count=7)
+        self.warm(post.get_absolute_url(), self.other.get_absolute_url())
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_comment_counts', stdout=StringIO())
+        self.assertContains(
+            self.assertRendered(post.get_absolute_url()), '0 comments'
+        )
+        self.assertCached(self.other.get_absolute_url())
+
+    def test_csrf_token_per_reader(self):
+        """Test that a cached page carries a token of the current reader"""
+        post = self.posts[0]
+        self.warm(post.get_absolute_url())
+
+        reader = Client(enforce_csrf_checks=True)
+        response = reader.get(post.get_absolute_url())
+        self.assertIsNone(response.context)
+        token = response.content.split(b'name="csrfmiddlewaretoken" value="')[1]
+        token = token.split(b'"')[0].decode()
+        response = reader.post(
+            reverse('blog:post_comment', args=[post.id]),
+            {
+                'name': 'Reader',
+                'email': 'reader@example.com',
+                'body': 'Cached page comment',
+                'csrfmiddlewaretoken': token,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Comment.objects.filter(body='Cached page comment').exists())
@@ -0,0 +1,69 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from ..models import Post
+
+
+class PostRenderingTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Markdown Post",
+            slug="markdown-post",
+            author=self.user,
+            body="Some **bold** text.",
+            status=Post.Status.PUBLISHED,
+        )
+
+    def test_body_rendered_on_create(self):
+        """Test that the HTML body and excerpt are stored on create"""
+        self.assertEqual(
+            self.post.body_html,
+            '<p>Some <strong>bold</strong> text.</p>'
+        )
+        self.assertEqual(self.post.excerpt, self.post.body_html)
+
+    def test_body_rendered_on_change(self):
+        """Test that a changed body is rendered again"""
+        post = Post.objects.get(id=self.post.id)
+        post.body = "New *body*"
+        post.save(update_fields=['body'])
+
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, '<p>New <em>body</em></p>')
+
+    def test_excerpt_truncated(self):
+        """Test that the excerpt keeps only the first words"""
+        self.post.body = ' '.join(['word'] * 100)
+        self.post.save()
+        self.assertEqual(len(self.post.excerpt.split()), 30)
+        self.assertTrue(self.post.excerpt.endswith('</p>'))
+
+    def test_render_posts_command(self):
+        """Test that the command backfills posts without HTML"""
+        Post.objects.filter(id=self.post.id).update(
+            body_html='', excerpt='', body_rendered=False,
+        )
+        call_command('render_posts', stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.assertIn('<strong>bold</strong>', self.post.body_html)
+        self.assertNotEqual(self.post.excerpt, '')
+
+    def test_render_posts_skips_empty_html(self):
+        """Test that posts rendering to nothing are not rendered again"""
+        Post.objects.filter(id=self.post.id).update(body='  ', body_rendered=False)
+        out = StringIO()
+        call_command('render_posts', stdout=out)
+        self.assertIn('Rendered 1 post(s).', out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.body_html, '')
+
+        out = StringIO()
+        call_command('render_posts', stdout=out)
+        self.assertIn('Rendered 0 post(s).', out.getvalue())
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from ..models import Post
 from django.utils import timezone
@@ -96,3 +96,73 @@ class PostSearchViewTest(TestCase):
         # Ensure the query matches regardless of case
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], self.post1)
+
+    def test_body_search(self):
+        """Test that the body is searched and highlighted."""
+        response = self.client.get(reverse('blog:post_search'), {'query': 'programming'})
+        self.assertEqual(response.status_code, 200)
+        results = response.context['results']
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0], self.post2)
+        self.assertIn('<b>programming</b>', results[0].headline)
+
+    def test_headline_from_rendered_body(self):
+        """Test that headlines show escaped text, without Markdown or HTML."""
+        Post.objects.create(
+            title="Markup",
+            slug="markup",
+            author=self.user,
+            body='**Strong** gardening, <div class="x">a < b gardening</div>',
+            status=Post.Status.PUBLISHED,
+            publish=timezone.now()
+        )
+        response = self.client.get(reverse('blog:post_search'), {'query': 'gardening'})
+        self.assertContains(
+            response, 'Strong <b>gardening</b>, a &lt; b <b>gardening</b>',
+        )
+        self.assertNotContains(response, '**')
+        self.assertNotContains(response, 'class=')
+
+    def test_title_ranked_above_body(self):
+        """Test that title matches rank above body matches."""
+        body_match = Post.objects.create(
+            title="Web Frameworks",
+            slug="web-frameworks",
+            author=self.user,
+            body="A comparison that mentions Python once.",
+            status=Post.Status.PUBLISHED,
+            publish=timezone.now()
+        )
+        response = self.client.get(reverse('blog:post_search'), {'query': 'python'})
+        results = response.context['results']
+
+        self.assertEqual(list(results), [self.post2, body_match])
+
+    def test_fuzzy_title_search(self):
+        """Test that misspelled titles still match through trigrams."""
+        response = self.client.get(reverse('blog:post_search'), {'query': 'Djanog Tutorial'})
+        results = response.context['results']
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0], self.post1)
+
+    @override_settings(BLOG_SEARCH_MAX_RESULTS=3, BLOG_SEARCH_RESULTS_PER_PAGE=2)
+    def test_results_capped_and_paginated(self):
+        """Test that results are paginated and the total is capped."""
+        for i in range(5):
+            Post.objects.create(
+                title=f"Django Recipe {i}",
+                slug=f"django-recipe-{i}",
+                author=self.user,
+                body="More Django.",
+                status=Post.Status.PUBLISHED,
+                publish=timezone.now()
+            )
+        response = self.client.get(reverse('blog:post_search'), {'query': 'django', 'page': 2})
+        results = response.context['results']
+
+        self.assertEqual(results.paginator.count, 3)
+        self.assertEqual(len(results), 1)
+        self.assertContains(response, 'Showing the first 3 results')
+        self.assertContains(response, 'href="?query=django&amp;page=1"')
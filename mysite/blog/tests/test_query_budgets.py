@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ..models import Comment, Post
+
+
+# Budgets of the rendering path, behind the page cache
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class QueryBudgetTest(TestCase):
+    """
+        Per-view query budgets on a seeded dataset, so that N+1 queries
+        fail the suite. The sidebar is warmed first as it is cached.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username='admin',
+            password='12345'
+        )
+        cls.posts = []
+        for i in range(12):
+            post = Post.objects.create(
+                title=f"Django post {i}",
+                slug=f"django-post-{i}",
+                author=cls.user,
+                body=f"Body of Django post {i}",
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.add('django', f'tag-{i % 3}')
+            for j in range(3):
+                Comment.objects.create(
+                    post=post,
+                    name=f"Commenter {j}",
+                    email="commenter@example.com",
+                    body="Nice post!",
+                )
+            cls.posts.append(post)
+
+    def setUp(self):
+        cache.clear()
+        Site.objects.clear_cache()
+        self.client.get(reverse('blog:post_list'))
+
+    def assertQueryBudget(self, budget, url, data=None):
+        with self.assertNumQueries(budget):
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_list(self):
+        # Page versions, posts and their prefetched tags
+        self.assertQueryBudget(3, reverse('blog:post_list'))
+
+    def test_post_list_by_tag(self):
+        # Page versions, tag, posts and their prefetched tags
+        self.assertQueryBudget(4, reverse('blog:post_list_by_tag', args=['django']))
+
+    def test_post_detail(self):
+        # Post version, post, similar posts and comments
+        self.assertQueryBudget(4, self.posts[0].get_absolute_url())
+
+    def test_post_search(self):
+        # Capped count and results
+        self.assertQueryBudget(2, reverse('blog:post_search'), {'query': 'django'})
+
+    def test_feed(self):
+        # Feed versions, current site and posts
+        self.assertQueryBudget(3, reverse('blog:post_feed'))
+
+    def test_feed_by_tag(self):
+        # Feed versions, tag, current site and posts
+        self.assertQueryBudget(4, reverse('blog:post_feed_by_tag', args=['django']))
+
+    def test_sitemap_index(self):
+        # Current site and sections
+        self.assertQueryBudget(2, reverse('sitemap'))
+
+    def test_sitemap_section(self):
+        # Sections, current site, paginator count and posts
+        section = self.posts[0].id // settings.BLOG_SITEMAP_SECTION_SIZE
+        self.assertQueryBudget(4, reverse('sitemap_section', args=[section]))
+
+    def test_comment_admin(self):
+        # Session, user, filtered and total counts, comments with their posts
+        self.client.force_login(self.user)
+        self.assertQueryBudget(5, reverse('admin:blog_comment_changelist'))
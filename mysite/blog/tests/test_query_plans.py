@@ -0,0 +1,201 @@
+"""
+Plans of the hot queries on a dataset large enough for the planner to
+choose the plans it would choose in production.
+
+Every case runs a code path of a view and EXPLAINs the queries it
+executed. A case fails on a sequential scan of the posts or comments,
+or when its cost exceeds the recorded baseline by more than
+COST_TOLERANCE. Tagged slow: ``make test`` leaves them out, ``make
+test_slow`` runs them.
+
+Costs depend on the PostgreSQL version and its planner settings, e.g.
+random_page_cost, besides the queries. After an intended change, or on
+a server configured differently from the one that recorded the
+baselines, record them again and commit query_plan_baselines.json:
+
+    BLOG_RECORD_QUERY_PLANS=1 python manage.py test blog.tests.test_query_plans
+"""
+import json
+import os
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from taggit.models import Tag
+from ..models import Comment, Post, SimilarPost
+from ..pagination import CursorPaginator
+from ..seeding import seed_dataset
+from ..templatetags.blog_tags import (
+    get_most_commented_posts,
+    show_latest_posts,
+    total_posts,
+)
+from ..views import (
+    POSTS_PER_PAGE,
+    _comment_paginator,
+    _listing_versions,
+    _post_versions,
+    _published_post,
+    _search_results,
+    _similar_posts,
+)
+
+BASELINES = Path(__file__).with_name('query_plan_baselines.json')
+RECORD = bool(os.environ.get('BLOG_RECORD_QUERY_PLANS'))
+# Planner statistics are sampled, costs vary a little between runs
+COST_TOLERANCE = 1.5
+# Posts matching the searched term
+SEARCH_MATCHES = 40
+SCANNED_TABLES = {'blog_post', 'blog_comment'}
+# Queries reading most of a table, where a sequential scan is the best plan
+SEQUENTIAL_SCANS_ALLOWED = {
+    # Every published post is counted, once per sidebar cache timeout
+    'sidebar': {'blog_post'},
+}
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+@tag('slow')
+class QueryPlanTest(TestCase):
+    baselines = {}
+    costs = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(
+            posts=20000,
+            tags=50,
+            comments=100000,
+            batch_size=5000,
+            method='copy',
+            render=False,
+            rebuild_similar=False,
+        )
+        # Every generated post shares the same few words, which no index
+        # narrows down: searches look for a term only a few posts contain
+        author = Post.objects.values_list('author', flat=True).first()
+        Post.objects.bulk_create(
+            Post(
+                title=f'Zeppelin notes {i}',
+                slug=f'zeppelin-notes-{i}',
+                author_id=author,
+                body='Lessons from running a zeppelin fleet.',
+                status=Post.Status.PUBLISHED,
+            )
+            for i in range(SEARCH_MATCHES)
+        )
+        with connection.cursor() as cursor:
+            for table in ('blog_post', 'blog_comment', 'blog_similarpost',
+                          'taggit_tag', 'taggit_taggeditem'):
+                cursor.execute(f'ANALYZE {table}')
+        cls.post = Post.published.order_by('-comment_count').first()
+        SimilarPost.objects.rebuild([cls.post.id])
+        cls.middle = Post.published.order_by('-publish')[10000]
+        cls.tag = Tag.objects.order_by('id').first()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if BASELINES.exists():
+            cls.baselines = json.loads(BASELINES.read_text())
+
+    @classmethod
+    def tearDownClass(cls):
+        if RECORD:
+            BASELINES.write_text(
+                json.dumps(dict(sorted(cls.costs.items())), indent=2) + '\n'
+            )
+        super().tearDownClass()
+
+    def assertPlans(self, case: str, run) -> None:
+        with CaptureQueriesContext(connection) as context:
+            run()
+        cost = 0.0
+        allowed = SEQUENTIAL_SCANS_ALLOWED.get(case, set())
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {query["sql"]}')
+                [[explained]] = cursor.fetchone()
+                plan = explained['Plan']
+                cost += plan['Total Cost']
+                for node in plan_nodes(plan):
+                    table = node.get('Relation Name')
+                    if node['Node Type'] == 'Seq Scan' and table not in allowed:
+                        self.assertNotIn(
+                            table, SCANNED_TABLES,
+                            f'{case}: sequential scan of {table} in\n{query["sql"]}',
+                        )
+        self.costs[case] = round(cost, 2)
+        if not RECORD:
+            self.assertIn(case, self.baselines, f'{case}: no recorded baseline')
+            self.assertLessEqual(
+                cost, self.baselines[case] * COST_TOLERANCE,
+                f'{case}: cost above the baseline of {self.baselines[case]}',
+            )
+
+    def test_post_list(self):
+        """Test the plans of the post list pages and their validator"""
+        paginator = CursorPaginator(Post.published.for_listing(), POSTS_PER_PAGE)
+        cursor = paginator.encode_cursor(self.middle)
+        self.assertPlans('post_list', lambda: paginator.page())
+        self.assertPlans('post_list_deep', lambda: paginator.page(cursor))
+        self.assertPlans(
+            'post_list_validator',
+            lambda: CursorPaginator(_listing_versions(), POSTS_PER_PAGE).page(),
+        )
+
+    def test_post_list_by_tag(self):
+        """Test the plans of the tag pages of the most used tag"""
+        self.assertPlans('post_list_by_tag', lambda: CursorPaginator(
+            Post.published.for_listing().tagged(self.tag),
+            POSTS_PER_PAGE,
+        ).page())
+        self.assertPlans('post_list_by_tag_validator', lambda: CursorPaginator(
+            _listing_versions(self.tag.slug), POSTS_PER_PAGE,
+        ).page())
+
+    def test_post_detail(self):
+        """Test the plans of the detail lookups, by slug and day"""
+        publish = timezone.localtime(self.post.publish)
+        url = (publish.year, publish.month, publish.day, self.post.slug)
+
+        def lookup():
+            _published_post(_post_versions(), *url)
+            _published_post(Post.published.select_related('author'), *url)
+
+        self.assertPlans('post_detail', lookup)
+
+    def test_comments(self):
+        """Test the plans of the comment pages of the most commented post"""
+        paginator = _comment_paginator(self.post.id)
+        last = Comment.objects.filter(post=self.post, activate=True).last()
+        cursor = paginator.encode_cursor(last, backwards=True)
+        self.assertPlans('comments', lambda: paginator.page())
+        self.assertPlans('comments_last', lambda: paginator.page(cursor))
+
+    def test_similar_posts(self):
+        """Test the plan of the similar posts of a post"""
+        self.assertPlans('similar_posts', lambda: list(_similar_posts(self.post)))
+
+    def test_post_search(self):
+        """Test the plans of the search results and their count"""
+        paginator = _search_results('zeppelin')
+        self.assertPlans(
+            'post_search', lambda: (paginator.count, list(paginator.page(1))),
+        )
+        self.assertEqual(paginator.count, SEARCH_MATCHES)
+
+    def test_sidebar(self):
+        """Test the plans of the sidebar tags"""
+        self.assertPlans('sidebar', lambda: (
+            total_posts(),
+            list(show_latest_posts(3)['latest_posts']),
+            list(get_most_commented_posts()),
+        ))
@@ -0,0 +1,192 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest import mock, skipUnless
+from mysite.routers import PrimaryReplicaRouter, PrimaryStickinessMiddleware
+from ..cache import invalidate_sidebar
+from ..models import Comment, Post
+
+
+@override_settings(BLOG_DB_REPLICAS=['replica1', 'replica2'])
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request, model=Post):
+        """Route a read of ``model`` while the middleware handles ``request``"""
+        routed = []
+
+        def get_response(request):
+            routed.append(self.router.db_for_read(model))
+            return HttpResponse()
+
+        response = PrimaryStickinessMiddleware(get_response)(request)
+        return routed[0], response
+
+    def test_reads_go_to_replicas(self):
+        """Test that blog reads of safe requests go to a replica"""
+        db, response = self.route(self.factory.get('/blog/'))
+        self.assertIn(db, ['replica1', 'replica2'])
+        self.assertNotIn(settings.BLOG_PRIMARY_COOKIE, response.cookies)
+
+    def test_other_apps_on_primary(self):
+        """Test that the reads of other apps stay on the primary"""
+        db, _ = self.route(self.factory.get('/blog/'), User)
+        self.assertIsNone(db)
+
+    def test_outside_requests_on_primary(self):
+        """Test that reads outside of a request use the primary"""
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_writes_stick_to_primary(self):
+        """Test that a write pins its client to the primary for a while"""
+        db, response = self.route(self.factory.post('/blog/1/comment/'))
+        self.assertIsNone(db)
+        cookie = response.cookies[settings.BLOG_PRIMARY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.BLOG_PRIMARY_STICKY_SECONDS)
+
+        request = self.factory.get('/blog/')
+        request.COOKIES[settings.BLOG_PRIMARY_COOKIE] = '1'
+        db, _ = self.route(request)
+        self.assertIsNone(db)
+
+    def test_transactions_on_primary(self):
+        """Test that reads inside a transaction see its writes"""
+        request = self.factory.get('/blog/')
+
+        def get_response(request):
+            with transaction.atomic():
+                return HttpResponse(self.router.db_for_read(Post) or 'default')
+
+        response = PrimaryStickinessMiddleware(get_response)(request)
+        self.assertEqual(response.content, b'default')
+
+    def test_no_migrations_on_replicas(self):
+        """Test that the replicas get no migrations"""
+        self.assertFalse(self.router.allow_migrate('replica1', 'blog'))
+        self.assertIsNone(self.router.allow_migrate('default', 'blog'))
+
+
+# The replica alias is the test database, and every read routed to it is
+# taken as stale, as from a lagging replica. Not in a test transaction,
+# whose reads stay on the primary.
+class LaggingReplicaTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Test Post",
+            slug="test-post",
+            author=self.user,
+            body="Test post content",
+            status=Post.Status.PUBLISHED,
+        )
+        self.post.tags.add('django')
+        self.replica_reads = []
+
+        def choose_replica(replicas):
+            self.replica_reads.append(replicas[0])
+            return replicas[0]
+
+        patcher = mock.patch('mysite.routers.random')
+        patcher.start().choice.side_effect = choose_replica
+        self.addCleanup(patcher.stop)
+
+    def count_replica_reads(self, url) -> int:
+        self.replica_reads.clear()
+        self.assertEqual(self.client.get(url).status_code, 200)
+        return len(self.replica_reads)
+
+    @override_settings(BLOG_DB_REPLICAS=['default'])
+    def test_pages_and_sitemaps_from_primary(self):
+        """Test that the pages and sitemaps to cache read the primary"""
+        for url in (
+            reverse('blog:post_list'),
+            self.post.get_absolute_url(),
+            reverse('sitemap'),
+            reverse(
+                'sitemap_section',
+                args=[self.post.id // settings.BLOG_SITEMAP_SECTION_SIZE],
+            ),
+        ):
+            self.assertEqual(self.count_replica_reads(url), 0)
+
+    @override_settings(BLOG_DB_REPLICAS=['default'])
+    def test_feeds_from_primary(self):
+        """Test that only the validators of the feeds read a replica"""
+        for url in (
+            reverse('blog:post_feed'),
+            reverse('blog:post_feed_by_tag', args=['django']),
+        ):
+            rendered = self.count_replica_reads(url)
+            self.assertEqual(rendered, self.count_replica_reads(url))
+
+    @override_settings(BLOG_DB_REPLICAS=['default'], BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_sidebar_from_primary(self):
+        """Test that uncached pages read a replica, but not for the sidebar"""
+        url = reverse('blog:post_list')
+        self.client.get(url)
+        page_reads = self.count_replica_reads(url)
+        self.assertTrue(page_reads)
+
+        invalidate_sidebar()
+        self.assertEqual(self.count_replica_reads(url), page_reads)
+
+
+# Run with DB_REPLICA_HOSTS set, the replicas mirror the test database
+@skipUnless(settings.BLOG_DB_REPLICAS, 'DB_REPLICA_HOSTS is not set')
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class ReplicaReadsTest(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Test Post",
+            slug="test-post",
+            author=self.user,
+            body="Test post content",
+            status=Post.Status.PUBLISHED,
+        )
+        self.replica = connections[settings.BLOG_DB_REPLICAS[0]]
+
+    def test_commenter_reads_primary(self):
+        """Test that pages are read from a replica, except by commenters"""
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica_queries)
+
+        response = self.client.post(
+            reverse('blog:post_comment', args=[self.post.id]),
+            {'name': 'Reader', 'email': 'reader@example.com', 'body': 'Nice'},
+        )
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertIn(settings.BLOG_PRIMARY_COOKIE, response.cookies)
+
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, 'Comment 1 by Reader')
+        self.assertFalse(replica_queries)
@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..models import Comment, Post
+
+
+# Pages must be rendered to exercise the sidebar fragment cache
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class SidebarCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(
+            title="Sidebar Post",
+            slug="sidebar-post",
+            author=self.user,
+            body="Sidebar post content",
+            status=Post.Status.PUBLISHED,
+        )
+
+    def count_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:post_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_sidebar_cached(self):
+        """Test that a warm sidebar runs no queries"""
+        cold = self.count_queries()
+        warm = self.count_queries()
+        self.assertEqual(cold - warm, 3)
+
+    def test_sidebar_invalidated_on_post_save(self):
+        """Test that saving a post clears the cached sidebar"""
+        self.count_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(
+                title="New Post",
+                slug="new-post",
+                author=self.user,
+                body="New post content",
+                status=Post.Status.PUBLISHED,
+            )
+        response = self.client.get(reverse('blog:post_list'))
+        self.assertContains(response, "written 2 posts")
+
+    def test_sidebar_invalidated_on_comment(self):
+        """Test that adding a comment clears the cached sidebar"""
+        cold = self.count_queries()
+        warm = self.count_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(
+                post=self.post,
+                name="Commenter",
+                email="commenter@example.com",
+                body="Nice post!",
+            )
+            # Renders before the commit would cache the old counts again
+            self.assertEqual(self.count_queries(), warm)
+        self.assertEqual(self.count_queries(), cold)
+
+    @override_settings(BLOG_SIDEBAR_CACHE_TIMEOUT=0)
+    def test_sidebar_cache_timeout(self):
+        """Test that the sidebar is cached for BLOG_SIDEBAR_CACHE_TIMEOUT"""
+        self.assertEqual(self.count_queries(), self.count_queries())
@@ -0,0 +1,145 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from ..models import Post, SimilarPost
+
+
+class SimilarPostsTest(TestCase):
+    def setUp(self):
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = self.create_post('main', 'django', 'python', 'web')
+        self.close = self.create_post('close', 'django', 'python')
+        self.far = self.create_post('far', 'web')
+
+    def create_post(self, slug, *tags, status=Post.Status.PUBLISHED) -> Post:
+        post = Post.objects.create(
+            title=slug.title(),
+            slug=slug,
+            author=self.user,
+            body=f"{slug} content",
+            status=status,
+        )
+        post.tags.add(*tags)
+        return post
+
+    def similar_to(self, post) -> list[Post]:
+        return [
+            entry.similar
+            for entry in SimilarPost.objects.filter(post=post)
+        ]
+
+    def test_ranked_by_shared_tags(self):
+        """Test that posts sharing more tags rank first"""
+        self.assertEqual(self.similar_to(self.post), [self.close, self.far])
+        self.assertEqual(self.similar_to(self.far), [self.post])
+
+    def test_refreshed_on_tag_remove(self):
+        """Test that removing a tag refreshes the neighbours"""
+        self.far.tags.remove('web')
+        self.assertEqual(self.similar_to(self.post), [self.close])
+        self.assertEqual(self.similar_to(self.far), [])
+
+    def test_refreshed_on_tag_clear(self):
+        """Test that clearing the tags refreshes the neighbours"""
+        self.post.tags.clear()
+        self.assertEqual(self.similar_to(self.close), [])
+        self.assertEqual(self.similar_to(self.post), [])
+
+    def test_drafts_excluded(self):
+        """Test that unpublished posts are not listed"""
+        self.close.status = Post.Status.DRAFT
+        self.close.save()
+        self.assertEqual(self.similar_to(self.post), [self.far])
+
+        self.close.status = Post.Status.PUBLISHED
+        self.close.save()
+        self.assertEqual(self.similar_to(self.post), [self.close, self.far])
+
+    def test_refreshed_on_delete(self):
+        """Test that deleting a post refreshes the lists it was in"""
+        self.close.delete()
+        self.assertEqual(self.similar_to(self.post), [self.far])
+
+    @override_settings(BLOG_SIMILAR_POSTS=1)
+    def test_trimmed_on_tag_add(self):
+        """Test that a post gaining tags replaces weaker entries"""
+        self.assertEqual(self.similar_to(self.far), [self.post])
+        newer = self.create_post('newer', 'web', 'django')
+        self.assertEqual(self.similar_to(self.far), [newer])
+        self.far.tags.add('django')
+        self.assertEqual(self.similar_to(self.far), [newer])
+        self.assertEqual(self.similar_to(self.close), [self.post])
+
+    @override_settings(BLOG_SIMILAR_POSTS=1)
+    def test_refilled_on_tag_remove(self):
+        """Test that a full list is refilled when its entry drops out"""
+        SimilarPost.objects.rebuild()
+        self.assertEqual(self.similar_to(self.post), [self.close])
+        self.close.tags.remove('python')
+        self.assertEqual(self.similar_to(self.post), [self.far])
+
+    @override_settings(BLOG_SIMILAR_POSTS=2)
+    def test_popular_tag_writes_entered_lists(self):
+        """Test that a post gaining a popular tag only writes the lists it enters"""
+        strong = [self.create_post(f'strong-{i}', 'popular', 'niche') for i in range(3)]
+        weak = [self.create_post(f'weak-{i}', 'popular') for i in range(2)]
+        newcomer = self.create_post('newcomer', 'other')
+        strong_lists = list(SimilarPost.objects.filter(post__in=strong).values_list(
+            'post', 'similar', 'shared_tags', 'rank',
+        ))
+        manager = SimilarPost.objects
+        with mock.patch.object(manager, '_rerank', wraps=manager._rerank) as rerank:
+            newcomer.tags.add('popular')
+        # The lists of the posts sharing two tags are full of better entries
+        [(reranked,), _] = rerank.call_args
+        self.assertEqual(set(reranked), {post.id for post in weak})
+        for post in weak:
+            self.assertEqual(self.similar_to(post)[0], newcomer)
+        self.assertEqual(
+            list(SimilarPost.objects.filter(post__in=strong).values_list(
+                'post', 'similar', 'shared_tags', 'rank',
+            )),
+            strong_lists,
+        )
+
+    @override_settings(BLOG_SIMILAR_CANDIDATES_PER_TAG=1)
+    def test_rebuild_candidates_capped(self):
+        """Test that rebuilds only consider the most recent posts of each tag"""
+        newest = self.create_post('newest', 'web')
+        SimilarPost.objects.rebuild()
+        self.assertEqual(self.similar_to(self.far), [newest])
+        self.assertEqual(self.similar_to(self.post), [self.close, newest])
+        # Itself the most recent post of its tag, it has no candidate left
+        self.assertEqual(self.similar_to(newest), [])
+
+    def test_incremental_matches_rebuild(self):
+        """Test that incremental updates match a full rebuild"""
+        self.far.tags.add('django', 'python')
+        self.close.tags.remove('python')
+        self.close.status = Post.Status.DRAFT
+        self.close.save()
+        self.close.status = Post.Status.PUBLISHED
+        self.close.save()
+        entries = list(SimilarPost.objects.order_by('post', 'rank').values_list(
+            'post', 'similar', 'shared_tags', 'rank',
+        ))
+        SimilarPost.objects.rebuild()
+        self.assertEqual(
+            list(SimilarPost.objects.order_by('post', 'rank').values_list(
+                'post', 'similar', 'shared_tags', 'rank',
+            )),
+            entries,
+        )
+
+    def test_rebuild_command(self):
+        """Test that the command rebuilds every list"""
+        SimilarPost.objects.all().delete()
+        call_command('rebuild_similar_posts', batch_size=2, stdout=StringIO())
+        self.assertEqual(self.similar_to(self.post), [self.close, self.far])
+        self.assertEqual(self.similar_to(self.close), [self.post])
@@ -0,0 +1,96 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from ..cache import sitemap_section_key
+from ..models import Post
+
+
+@override_settings(BLOG_SITEMAP_SECTION_SIZE=2)
+class SitemapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Create a test user
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.posts = [self.create_post(i) for i in range(5)]
+
+    def create_post(self, i, status=Post.Status.PUBLISHED) -> Post:
+        return Post.objects.create(
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            author=self.user,
+            body=f"Body {i}",
+            status=status,
+        )
+
+    def section_url(self, post) -> str:
+        return reverse('sitemap_section', args=[post.id // 2])
+
+    def test_index_lists_sections(self):
+        """Test that the index links every section holding posts"""
+        response = self.client.get(reverse('sitemap'))
+        sections = {self.section_url(post) for post in self.posts}
+        self.assertEqual(response.content.count(b'<sitemap>'), len(sections))
+        for url in sections:
+            self.assertContains(response, url)
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(self.posts[-1].updated.timestamp()),
+        )
+
+    def test_section_lists_its_posts(self):
+        """Test that a section lists the posts of its id range only"""
+        post = self.posts[2]
+        response = self.client.get(self.section_url(post))
+        in_section = [p for p in self.posts if p.id // 2 == post.id // 2]
+        self.assertEqual(response.content.count(b'<url>'), len(in_section))
+        for p in in_section:
+            self.assertContains(response, p.get_absolute_url())
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(in_section[-1].updated.timestamp()),
+        )
+
+    def test_section_cached_until_post_changes(self):
+        """Test that sections are cached and refreshed on post changes"""
+        post = self.posts[0]
+        url = self.section_url(post)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        post.slug = 'renamed-post'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+            # Until committed, a render would cache the old post again
+            with self.assertNumQueries(0):
+                self.client.get(url)
+        self.assertContains(self.client.get(url), 'renamed-post')
+
+    def test_drafts_excluded(self):
+        """Test that drafts and empty sections are not listed"""
+        post = self.posts[-1]
+        post.status = Post.Status.DRAFT
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        # The section may be left empty, and not found
+        response = self.client.get(self.section_url(post))
+        self.assertNotIn(post.slug.encode(), response.content)
+
+        empty = reverse('sitemap_section', args=[post.id // 2 + 1])
+        self.assertEqual(self.client.get(empty).status_code, 404)
+
+    def test_unknown_sections_not_cached(self):
+        """Test that sections without published posts are not cached"""
+        self.client.get(reverse('sitemap'))
+        for section in (self.posts[-1].id // 2 + 1, 10 ** 9):
+            with self.assertNumQueries(0):
+                response = self.client.get(
+                    reverse('sitemap_section', args=[section])
+                )
+            self.assertEqual(response.status_code, 404)
+            self.assertIsNone(cache.get(sitemap_section_key(section, 'http')))
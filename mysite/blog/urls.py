@@ -1,22 +1,32 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
-from .feeds import LatestPostsFeed
+from . import api, async_views, views
+from .feeds import LatestPostsFeed, TagPostsFeed
 
 app_name = 'blog'
 
+if settings.BLOG_ASYNC_VIEWS:
+    reads = async_views
+    post_feed = async_views.post_feed
+    post_feed_by_tag = async_views.post_feed_by_tag
+else:
+    reads = views
+    post_feed = LatestPostsFeed()
+    post_feed_by_tag = TagPostsFeed()
+
 urlpatterns = [
     # Posts views
-    path('', views.post_list, name='post_list'),
+    path('', reads.post_list, name='post_list'),
     # path('', views.PostListView.as_view(), name='post_list'),
     path(
         'tag/<slug:tag_slug>/',
-        views.post_list,
+        reads.post_list,
         name='post_list_by_tag',
     ),
     path(
         '<int:year>/<int:month>/<int:day>/<slug:post>/',
-        views.post_detail,
+        reads.post_detail,
         name='post_detail'
     ),
     path(
@@ -24,6 +34,11 @@ urlpatterns = [
         views.post_share,
         name='post_share',
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path(
         '<int:post_id>/comment/',
         views.post_comment,
@@ -31,8 +46,18 @@ urlpatterns = [
     ),
     path(
         'feed/',
-        LatestPostsFeed(),
+        post_feed,
         name='post_feed',
     ),
-    path('search/', views.post_search, name='post_search')
+    path(
+        'feed/tag/<slug:tag_slug>/',
+        post_feed_by_tag,
+        name='post_feed_by_tag',
+    ),
+    path('search/', reads.post_search, name='post_search'),
+    # JSON API
+    path('api/posts/', api.post_list, name='api_post_list'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('api/tags/', api.tag_list, name='api_tag_list'),
+    path('api/search/', api.post_search, name='api_post_search'),
 ]
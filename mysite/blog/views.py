@@ -1,34 +1,76 @@
-from django.core.mail import send_mail
+from django.conf import settings
 from django.core.paginator import EmptyPage, Paginator, PageNotAnInteger
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render
-from django.contrib.postgres.search import TrigramSimilarity
 from django.views.decorators.http import require_POST
 from django.views.generic import ListView
-from django.db.models import Count
 from taggit.models import Tag
 
+from .conditional import Validator, conditional, make_validator
 from .forms import EmailPostForm, CommentForm, SearchForm
-from .models import Post
+from .pagecache import (
+    POSTS,
+    SIMILAR_POSTS,
+    cache_anonymous_page,
+    depends_on,
+    post_dependency,
+    similar_dependency,
+    tag_dependency,
+)
+from .models import Comment, OutgoingEmail, Post, SimilarPost
+from .pagination import CursorPaginator, InvalidCursor
 
 
+POSTS_PER_PAGE = 3
+
+
+def _cursor_page(posts_list, request: HttpRequest):
+    paginator = CursorPaginator(posts_list, POSTS_PER_PAGE)
+    try:
+        return paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        # If the cursor is malformed get the first page
+        return paginator.page()
+
+
+def _listing_versions(tag_slug: str = None):
+    posts_list = Post.published.only('id', 'publish', 'updated')
+    if tag_slug:
+        posts_list = posts_list.tagged(tag_slug)
+    return posts_list
+
+
+def _list_validator(page) -> Validator:
+    # No Last-Modified: a post leaving the page makes it no older
+    return make_validator(
+        (
+            [(post.id, post.updated) for post in page],
+            page.has_previous(),
+            page.has_next(),
+        ),
+        None,
+    )
+
+
+def post_list_validator(request: HttpRequest, tag_slug: str = None) -> Validator:
+    """
+        Versions of the posts on the requested page
+    """
+    return _list_validator(_cursor_page(_listing_versions(tag_slug), request))
+
+
+@cache_anonymous_page
+@conditional(post_list_validator)
 def post_list(request: HttpRequest, tag_slug: str = None) -> HttpResponse:
-    posts_list = Post.published.all()
+    posts_list = Post.published.for_listing()
     tag = None
     if tag_slug:
         tag = get_object_or_404(Tag, slug=tag_slug)
-        posts_list = posts_list.filter(tags__in=[tag])
+        posts_list = posts_list.tagged(tag)
+        depends_on(tag_dependency(tag.slug))
 
-    paginator = Paginator(posts_list, 3)
-    page_number = request.GET.get('page', 1)
-    try:
-        posts = paginator.page(page_number)
-    except PageNotAnInteger:
-        # If page_number is not an integer get the first page
-        posts = paginator.page(1)
-    except EmptyPage:
-        # If page_number is out of range get last page of results
-        posts = paginator.page(paginator.num_pages)
+    posts = _cursor_page(posts_list, request)
+    depends_on(POSTS, *(post_dependency(post.id) for post in posts))
     return render(
         request,
         'blog/post/list.html',
@@ -39,39 +81,104 @@ def post_list(request: HttpRequest, tag_slug: str = None) -> HttpResponse:
     )
 
 
-def post_detail(request: HttpRequest, year: int, month: int, day: int, post: str) -> HttpResponse:
-    post = get_object_or_404(
-        Post,
-        status=Post.Status.PUBLISHED,
-        slug=post,
-        publish__year=year,
-        publish__month=month,
-        publish__day=day,
+def _published_lookup(queryset, year: int, month: int, day: int, slug: str):
+    """
+        ``queryset`` filtered by the indexed slug and day to the published
+        post at this URL, or None for days that do not exist
+    """
+    try:
+        return queryset.published_on(year, month, day).filter(slug=slug)
+    except (ValueError, OverflowError):
+        # No such day, or no next day to end its range, e.g. 9999-12-31
+        return None
+
+
+def _published_post(queryset, year: int, month: int, day: int, slug: str):
+    """
+        First row of ``queryset`` for the published post at this URL, or
+        None
+    """
+    lookup = _published_lookup(queryset, year, month, day, slug)
+    return None if lookup is None else lookup.first()
+
+
+def _post_versions():
+    return Post.published.values_list('id', 'updated', 'comment_count')
+
+
+def _post_validator(row) -> Validator | None:
+    if row is None:
+        return None
+    _, updated, _ = row
+    return make_validator(row, updated)
+
+
+def post_detail_validator(request: HttpRequest, year: int, month: int, day: int,
+                          post: str) -> Validator | None:
+    """
+        Version of the post, which its comments touch too. The comment
+        form token needs no part in it: pages rendering it vary on the
+        CSRF cookie.
+    """
+    return _post_validator(
+        _published_post(_post_versions(), year, month, day, post)
     )
 
-    # List of active comments for this post
-    comments = post.comments.filter(activate=True)
-    # Form for users to comment
-    form = CommentForm()
 
+def _similar_posts(post: Post):
+    # Precomputed from the shared tags
+    return SimilarPost.objects.filter(
+        post=post,
+        similar__status=Post.Status.PUBLISHED,
+    ).select_related('similar').defer(
+        'similar__body', 'similar__body_html', 'similar__search_vector'
+    )
+
+
+def _comment_paginator(post_id: int) -> CursorPaginator:
+    # Oldest first, read from the partial index of the active comments
+    return CursorPaginator(
+        Comment.objects.filter(post_id=post_id, activate=True),
+        settings.BLOG_COMMENTS_PER_PAGE,
+        ordering=('created', 'id'),
+    )
+
+
+def _detail_context(post: Post, comments, similar_posts: list[Post]) -> dict:
+    depends_on(
+        post_dependency(post.id),
+        SIMILAR_POSTS,
+        similar_dependency(post.id),
+        *(post_dependency(similar.id) for similar in similar_posts),
+    )
+    return {
+        'post': post,
+        'comments': comments,
+        # Form for users to comment
+        'form': CommentForm(),
+        'similar_posts': similar_posts
+    }
+
+
+@cache_anonymous_page
+@conditional(post_detail_validator)
+def post_detail(request: HttpRequest, year: int, month: int, day: int, post: str) -> HttpResponse:
+    post = _published_post(
+        Post.published.select_related('author'), year, month, day, post,
+    )
+    if post is None:
+        raise Http404('No post at this date')
+
+    # First page of active comments for this post, the others are
+    # loaded from post_comments
+    comments = _comment_paginator(post.id).page()
     # List of similar posts
-    post_tags_id = post.tags.values_list('id', flat=True)
-    similar_posts = Post.published.filter(
-        tags__in=post_tags_id
-    ).exclude(id=post.id)
-    similar_posts = similar_posts.annotate(
-        same_tags=Count('tags')
-    ).order_by('-same_tags', '-publish')[:4]
+    similar_posts = [entry.similar for entry in _similar_posts(post)]
 
     return render(
         request,
         'blog/post/detail.html',
-        {
-            'post': post,
-            'comments': comments,
-            'form': form,
-            'similar_posts': similar_posts
-        }
+        _detail_context(post, comments, similar_posts),
     )
 
 
@@ -79,11 +186,19 @@ class PostListView(ListView):
     """
         Alternative post list view
     """
-    queryset = Post.published.all()
+    queryset = Post.published.for_listing()
     context_object_name = 'posts'
-    paginate_by = 3
+    paginate_by = POSTS_PER_PAGE
     template_name = 'blog/post/list.html'
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            page = paginator.page()
+        return paginator, page, page, page.has_other_pages()
+
 
 def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
     # Retrieve post by id
@@ -111,11 +226,11 @@ def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
                 f"Read {post.title} at {post_url}\n\n"
                 f"{cd['name']}'s comments: {cd['comments']}"
             )
-            send_mail(
+            # Queued for the send_outbox worker
+            OutgoingEmail.objects.create(
                 subject=subject,
-                message=message,
-                from_email=None,
-                recipient_list=[cd['to']],
+                body=message,
+                to=cd['to'],
             )
             sent = True
 
@@ -132,6 +247,29 @@ def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
     )
 
 
+def post_comments(request: HttpRequest, post_id: int) -> JsonResponse:
+    """
+        Page of active comments after the ``cursor`` of the previous page
+    """
+    post = get_object_or_404(Post.published.only('id'), id=post_id)
+    try:
+        comments = _comment_paginator(post.id).page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.id,
+                'name': comment.name,
+                'body': comment.body,
+                'created': comment.created,
+            }
+            for comment in comments
+        ],
+        'next_cursor': comments.next_cursor,
+    })
+
+
 @require_POST
 def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
     post = get_object_or_404(
@@ -160,6 +298,35 @@ def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
     )
 
 
+def _search_results(query: str) -> Paginator:
+    # Cap the result set so that vague queries stay cheap, the results
+    # only show their titles, links and headlines
+    return Paginator(
+        Post.published.without_bodies().search(query)[
+            :settings.BLOG_SEARCH_MAX_RESULTS
+        ],
+        settings.BLOG_SEARCH_RESULTS_PER_PAGE,
+    )
+
+
+def _search_page(paginator: Paginator, page_number):
+    try:
+        return paginator.page(page_number)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
+def _search_context(form: SearchForm, query: str | None, results) -> dict:
+    return {
+        'form': form,
+        'query': query,
+        'results': results,
+        'max_results': settings.BLOG_SEARCH_MAX_RESULTS,
+    }
+
+
 def post_search(request: HttpRequest) -> HttpResponse:
     form = SearchForm()
     query = None
@@ -169,20 +336,11 @@ def post_search(request: HttpRequest) -> HttpResponse:
         form = SearchForm(request.GET)
         if form.is_valid():
             query = form.cleaned_data['query']
-            results = (
-                Post.published.annotate(
-                    similarity=TrigramSimilarity('title', query)
-                )
-                .filter(similarity__gt=0.1)
-                .order_by('-similarity')
-            )
+            paginator = _search_results(query)
+            results = _search_page(paginator, request.GET.get('page', 1))
 
     return render(
         request,
         'blog/post/search.html',
-        {
-            'form': form,
-            'query': query,
-            'results': results
-        }
+        _search_context(form, query, results),
     )
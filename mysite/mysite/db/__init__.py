@@ -0,0 +1,4 @@
+"""
+PostgreSQL backend with a psycopg connection pool, configured like the pool
+of Django 5.1 through ``OPTIONS['pool']``.
+"""
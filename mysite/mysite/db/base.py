@@ -0,0 +1,152 @@
+"""
+PostgreSQL database backend taking its connections from a psycopg pool.
+
+Django opens a connection for every request unless CONN_MAX_AGE keeps it,
+and a fresh connection costs a TCP and authentication handshake. With
+``OPTIONS['pool']`` set, to True or to the ConnectionPool arguments, each
+process keeps a pool per database alias: Django still closes the
+connection at the end of the request, which returns it to the pool.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as BaseCreation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from mysite.metrics import registry
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseCreation(BaseCreation):
+    # The pool of the test database must not outlive it, nor precede it
+
+    def create_test_db(self, *args, **kwargs):
+        self.connection.close_pool()
+        return super().create_test_db(*args, **kwargs)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Replicas mirroring the test database have pools of their own
+        for connection in connections.all():
+            if isinstance(connection, DatabaseWrapper):
+                connection.close_pool()
+        return super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.settings_dict['OPTIONS'].get('pool') and self.settings_dict['CONN_MAX_AGE']:
+            raise ImproperlyConfigured(
+                'Pooled connections require CONN_MAX_AGE = 0.'
+            )
+
+    @property
+    def pool(self) -> ConnectionPool | None:
+        pool_options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        with _pools_lock:
+            if self.alias not in _pools:
+                pool_options = {} if pool_options is True else dict(pool_options)
+                check = pool_options.pop('check', True)
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    open=False,
+                    # Connections broken while idle are replaced, not handed out
+                    check=ConnectionPool.check_connection if check else None,
+                    name=self.alias,
+                    **pool_options,
+                )
+                pool.open()
+                _pools[self.alias] = pool
+            return _pools[self.alias]
+
+    def close_pool(self) -> None:
+        with _pools_lock:
+            pool = _pools.pop(self.alias, None)
+        if pool is not None:
+            self.close()
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get(
+                'isolation_level', IsolationLevel.READ_COMMITTED,
+            )
+        )
+        connection = pool.getconn()
+        connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        # Returned to the pool it came from, even if closed since
+        pool = getattr(self.connection, '_pool', None)
+        if pool is not None:
+            with self.wrap_database_errors:
+                # Rolled back if needed and reused, or discarded if broken
+                pool.putconn(self.connection)
+            self.connection = None
+        else:
+            super()._close()
+
+
+def pool_metrics() -> list[str]:
+    """
+        Prometheus lines describing the pools of the process
+    """
+    with _pools_lock:
+        stats = {alias: pool.get_stats() for alias, pool in _pools.items()}
+    lines = []
+    for name, kind, help_text, value in (
+        ('mysite_db_pool_connections_in_use', 'gauge',
+         'Pooled connections lent to a request.',
+         lambda s: s['pool_size'] - s['pool_available']),
+        ('mysite_db_pool_connections_idle', 'gauge',
+         'Pooled connections ready to be lent.',
+         lambda s: s['pool_available']),
+        ('mysite_db_pool_max_connections', 'gauge',
+         'Maximum size of the pool.',
+         lambda s: s['pool_max']),
+        ('mysite_db_pool_requests_waiting', 'gauge',
+         'Requests waiting for a connection.',
+         lambda s: s['requests_waiting']),
+        ('mysite_db_pool_requests_total', 'counter',
+         'Connections requested from the pool.',
+         lambda s: s.get('requests_num', 0)),
+        ('mysite_db_pool_wait_seconds_total', 'counter',
+         'Time spent waiting for a connection.',
+         lambda s: s.get('requests_wait_ms', 0) / 1000),
+        ('mysite_db_pool_timeouts_total', 'counter',
+         'Requests that got no connection in time.',
+         lambda s: s.get('requests_errors', 0)),
+        ('mysite_db_pool_connects_total', 'counter',
+         'Connections opened to the database.',
+         lambda s: s.get('connections_num', 0)),
+        ('mysite_db_pool_connections_lost_total', 'counter',
+         'Connections found broken by the health check.',
+         lambda s: s.get('connections_lost', 0)),
+    ):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for alias, pool_stats in sorted(stats.items()):
+            lines.append(f'{name}{{alias="{alias}"}} {value(pool_stats)}')
+    return lines
+
+
+registry.collectors.append(pool_metrics)
@@ -0,0 +1,222 @@
+"""
+Per-request SQL and template timings.
+
+RequestMetricsMiddleware measures every request, sends the timings back in a
+Server-Timing header and aggregates them into in-memory histograms per URL
+name. The histograms are served in the Prometheus text format by the
+``metrics`` view.
+"""
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates
+
+_current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def server_timing(self, total: float) -> str:
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# name: (help, buckets)
+METRICS = {
+    'mysite_request_duration_seconds': (
+        'Time spent handling the request.', SECONDS_BUCKETS,
+    ),
+    'mysite_request_db_duration_seconds': (
+        'Time spent running SQL queries.', SECONDS_BUCKETS,
+    ),
+    'mysite_request_db_queries': (
+        'Number of SQL queries.', QUERIES_BUCKETS,
+    ),
+    'mysite_request_render_duration_seconds': (
+        'Time spent rendering templates.', SECONDS_BUCKETS,
+    ),
+}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {name: {} for name in METRICS}
+        # Callables returning extra lines in the Prometheus text format
+        self.collectors = []
+
+    def observe(self, view: str, timings: RequestTimings, total: float) -> None:
+        values = {
+            'mysite_request_duration_seconds': total,
+            'mysite_request_db_duration_seconds': timings.db_time,
+            'mysite_request_db_queries': timings.queries,
+            'mysite_request_render_duration_seconds': timings.render_time,
+        }
+        with self.lock:
+            for name, value in values.items():
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = Histogram(METRICS[name][1])
+                    self.histograms[name][view] = histogram
+                histogram.observe(value)
+
+    def reset(self) -> None:
+        with self.lock:
+            for histograms in self.histograms.values():
+                histograms.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, histogram in sorted(self.histograms[name].items()):
+                    label = f'view="{view}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{label}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{label}}} {histogram.count}')
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        timings = _current_timings.get()
+        if timings is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timings.render_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+        Django template backend measuring the render time of each request
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, timings)
+                response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.record(request, response, timings, start)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            # The connections belong to the thread running the sync code of
+            # this request, the async ORM queries included
+            stack = ExitStack()
+            await sync_to_async(self.wrap_connections)(stack, timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current_timings.reset(token)
+        return self.record(request, response, timings, start)
+
+    def wrap_connections(self, stack: ExitStack, timings: RequestTimings) -> None:
+        for connection in connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(timings.execute_wrapper)
+            )
+
+    def record(self, request: HttpRequest, response: HttpResponse,
+               timings: RequestTimings, start: float) -> HttpResponse:
+        total = time.perf_counter() - start
+        response['Server-Timing'] = timings.server_timing(total)
+        match = request.resolver_match
+        registry.observe(match.view_name if match else '<unresolved>', timings, total)
+        return response
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
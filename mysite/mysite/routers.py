@@ -0,0 +1,112 @@
+"""
+Routing of the blog reads to the read replicas.
+
+PrimaryStickinessMiddleware lets the reads of a request go to a replica
+only when the request is safe and its client wrote nothing recently: a
+write sets a cookie pinning the client to the primary for
+BLOG_PRIMARY_STICKY_SECONDS, longer than the replication lag, so that a
+reader sees the comment they just posted. Everything else, management
+commands, writes and reads inside a transaction included, uses the
+primary, and so do the reads in ``primary_reads()`` blocks: those filling
+the shared caches, which a lagging replica would fill with stale content
+for every reader.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# Apps whose tables are read from the replicas
+REPLICATED_APPS = {'blog', 'taggit'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+@contextmanager
+def primary_reads():
+    """
+        Read from the primary within the block
+    """
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints) -> str | None:
+        replicas = settings.BLOG_DB_REPLICAS
+        if (
+            replicas
+            and _replica_reads.get()
+            and model._meta.app_label in REPLICATED_APPS
+            # Reads of a transaction must see its writes
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # The replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        # Replicas get the schema by replication
+        if db in settings.BLOG_DB_REPLICAS:
+            return False
+        return None
+
+
+class PrimaryStickinessMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _replica_reads.set(self.reads_replicas(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self.stick(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = _replica_reads.set(self.reads_replicas(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self.stick(request, response)
+
+    def reads_replicas(self, request: HttpRequest) -> bool:
+        return (
+            request.method in SAFE_METHODS
+            and settings.BLOG_PRIMARY_COOKIE not in request.COOKIES
+        )
+
+    def stick(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if request.method not in SAFE_METHODS and settings.BLOG_DB_REPLICAS:
+            response.set_cookie(
+                settings.BLOG_PRIMARY_COOKIE,
+                '1',
+                max_age=settings.BLOG_PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
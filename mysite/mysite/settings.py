@@ -11,8 +11,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import copy
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,6 +30,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Addresses allowed to read the /metrics/ endpoint
+INTERNAL_IPS = ['127.0.0.1']
+
 SITE_ID = 1
 
 
@@ -53,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mysite.metrics.RequestMetricsMiddleware',
+    'mysite.routers.PrimaryStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,7 +72,7 @@ ROOT_URLCONF = 'mysite.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'mysite.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -95,11 +101,64 @@ WSGI_APPLICATION = 'mysite.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # django.db.backends.postgresql with a connection pool, see mysite.db
+        'ENGINE': 'mysite.db',
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
+        'OPTIONS': {
+            # False to open a connection per request
+            'pool': config('DB_POOL', default=True, cast=bool) and {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                # Seconds a request waits for a connection before failing
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+                # Seconds before idle connections above min_size are closed
+                'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),
+                # Seconds before a connection is replaced
+                'max_lifetime': config(
+                    'DB_POOL_MAX_LIFETIME', default=3600, cast=float,
+                ),
+                # Check that a connection is alive before lending it
+                'check': config('DB_POOL_CHECK', default=True, cast=bool),
+            },
+        },
+    }
+}
+
+# Read replicas of the default database, e.g. DB_REPLICA_HOSTS=replica1,replica2
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+BLOG_DB_REPLICAS = []
+for number, host in enumerate(DB_REPLICA_HOSTS, 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': host,
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        # Tests read the rows they write on the primary
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['mysite.routers.PrimaryReplicaRouter']
+
+# Clients that wrote read from the primary for this many seconds, longer
+# than the replication lag, through this cookie
+BLOG_PRIMARY_STICKY_SECONDS = 10
+BLOG_PRIMARY_COOKIE = 'blog_primary'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': config('CACHE_LOCATION', default='blog'),
     }
 }
 
@@ -153,5 +212,51 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_FROM = config('DEFAULT_FROM_EMAIL')
 
+# Outbox delivery: failed emails are retried after 1, 2, 4... times the
+# delay in seconds, and marked as dead after the last attempt
+BLOG_OUTBOX_MAX_ATTEMPTS = 5
+BLOG_OUTBOX_RETRY_DELAY = 60
+# Seconds a worker has to send the emails it claimed, before another
+# worker may claim them again
+BLOG_OUTBOX_CLAIM_TIMEOUT = 600
+
 # OpenAI API
 OPENAI_API_KEY = config('OPENAI_API_KEY')
+# Any OpenAI compatible API, e.g. a local stub server, when set
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default=None)
+
+# Blog search
+BLOG_SEARCH_TRIGRAM_THRESHOLD = 0.3
+BLOG_SEARCH_MAX_RESULTS = 100
+BLOG_SEARCH_RESULTS_PER_PAGE = 10
+
+# Number of precomputed similar posts per post
+BLOG_SIMILAR_POSTS = 4
+# Most recent posts of each tag considered by the rebuilds of the similar
+# posts, older ones are only listed when they gain tags or are published
+BLOG_SIMILAR_CANDIDATES_PER_TAG = 200
+
+# Comments per page of a post, more are loaded on demand
+BLOG_COMMENTS_PER_PAGE = 20
+
+# Posts or tags per page of the JSON API
+BLOG_API_PAGE_SIZE = 20
+
+# Lifetime in seconds of the cached sidebar, refreshed sooner on post and
+# comment changes
+BLOG_SIDEBAR_CACHE_TIMEOUT = 600
+
+# Lifetime in seconds of the pages cached for anonymous readers and of
+# the cached feeds, 0 to disable the cache
+BLOG_PAGE_CACHE_TIMEOUT = 600
+
+# Range of post ids per sitemap section, at most 50000 URLs per sitemap
+BLOG_SITEMAP_SECTION_SIZE = 10000
+
+# Lifetime in seconds of the cached sitemaps, refreshed sooner on post
+# changes
+BLOG_SITEMAP_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Route the read-only pages to the async views of blog.async_views. Only
+# useful when served over ASGI, e.g. uvicorn mysite.asgi:application
+BLOG_ASYNC_VIEWS = config('BLOG_ASYNC_VIEWS', default=False, cast=bool)
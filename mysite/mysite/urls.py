@@ -15,21 +15,22 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
-from blog.sitemaps import PostSitemaps
-
-sitemaps = {
-    'posts': PostSitemaps,
-}
+from blog.sitemaps import sitemap_index, sitemap_section
+from mysite.metrics import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('blog/', include('blog.urls', namespace='blog')),
     path(
         'sitemap.xml',
-        sitemap,
-        {'sitemaps': sitemaps},
-        name='django.contrib.sitemaps.views.sitemap',
+        sitemap_index,
+        name='sitemap',
+    ),
+    path(
+        'sitemap-<int:section>.xml',
+        sitemap_section,
+        name='sitemap_section',
     ),
+    path('metrics/', metrics, name='metrics'),
 ]